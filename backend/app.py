@@ -1,50 +1,66 @@
-from flask import Flask, jsonify, request
-from flask_cors import CORS
+from flask import Flask, jsonify
 from config import Config
 from routes import register_all_routes
-from flask import Flask, jsonify, request, make_response
+from utils.cors import CORSMiddleware
+from utils.compression import GzipMiddleware
+from utils.cache import cache
+from utils.responses import OrjsonProvider
+from utils.supabase_client import get_supabase_client
+from logging_config import configure_logging
 import logging
+import threading
+import time
 
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-)
+configure_logging()
 logger = logging.getLogger(__name__)
 
-def create_app(config_class=Config):
+# Build the Supabase client at import so the first probe doesn't pay for it;
+# get_supabase_client() retries on demand if this fails
+try:
+    get_supabase_client()
+except Exception as e:
+    logger.error(f"Supabase client warm-up failed: {str(e)}")
+
+# Last readiness probe result as (checked_at, ok, error), shared across requests
+_readiness = (None, False, None)
+_readiness_lock = threading.Lock()
+
+def check_database_ready(ttl=Config.HEALTH_CACHE_TTL):
+    """Probe Supabase, reusing the previous result while it is fresher than ttl"""
+    global _readiness
+    with _readiness_lock:
+        checked_at, ok, error = _readiness
+        if checked_at is not None and time.monotonic() - checked_at < ttl:
+            return ok, error
+        try:
+            db = get_supabase_client()
+            db.get_client().table('energy_buildings').select('id').limit(1).execute()
+            ok, error = True, None
+        except Exception as e:
+            logger.error(f"Readiness check failed: {str(e)}")
+            ok, error = False, str(e)
+        _readiness = (time.monotonic(), ok, error)
+        return ok, error
+
+def create_app(config_class=Config, cors_origins=None):
     app = Flask(__name__)
     app.config.from_object(config_class)
+    app.json = OrjsonProvider(app)
     
-    # CORS configuration
-    CORS(app, resources={
-        r"/api/*": {
-            "origins": "*",
-            "methods": ["GET", "POST", "PUT", "DELETE", "OPTIONS"],
-            "allow_headers": ["Content-Type", "Authorization"],
-            "supports_credentials": False  # Cambia a False si no usas cookies
-        }
-    })
-    
-    # AGREGAR ESTO: Handler global para OPTIONS
-    @app.before_request
-    def handle_preflight():
-        if request.method == "OPTIONS":
-            response = jsonify({'status': 'ok'})
-            response.headers.add('Access-Control-Allow-Origin', '*')
-            response.headers.add('Access-Control-Allow-Headers', 'Content-Type,Authorization')
-            response.headers.add('Access-Control-Allow-Methods', 'GET,POST,PUT,DELETE,OPTIONS')
-            return response, 200
+    # CORS is handled at the WSGI layer so preflights never reach Flask
+    app.wsgi_app = CORSMiddleware(
+        app.wsgi_app,
+        origins=cors_origins or config_class.CORS_ORIGINS
+    )
+    app.wsgi_app = GzipMiddleware(
+        app.wsgi_app,
+        min_size=config_class.COMPRESS_MIN_SIZE,
+        level=config_class.COMPRESS_LEVEL
+    )
     
+    cache.init_app(app)
     register_all_routes(app)
-    @app.before_request
-    def handle_preflight():
-        if request.method == "OPTIONS":
-            response = make_response()
-            response.headers.add("Access-Control-Allow-Origin", "*")
-            response.headers.add("Access-Control-Allow-Headers", "Content-Type,Authorization")
-            response.headers.add("Access-Control-Allow-Methods", "GET,POST,PUT,DELETE,OPTIONS")
-            response.headers.add("Access-Control-Max-Age", "3600")
-            return response
+    
     # Root endpoint
     @app.route('/')
     def index():
@@ -54,6 +70,7 @@ def create_app(config_class=Config):
             'status': 'running',
             'endpoints': {
                 'health': '/health',
+                'ready': '/ready',
                 'energy': '/api/energy/*',
                 'weather': '/api/weather/*',
                 'traffic': '/api/traffic/*',
@@ -65,24 +82,28 @@ def create_app(config_class=Config):
     
     @app.route('/health')
     def health():
-        try:
-            from utils.supabase_client import SupabaseClient
-            db = SupabaseClient()
-            db.get_client().table('energy_buildings').select('id').limit(1).execute()
+        return jsonify({
+            'status': 'healthy',
+            'service': 'Energy Insights API',
+            'timestamp': Config.DATA_END_DATE.isoformat()
+        }), 200
+    
+    @app.route('/ready')
+    def ready():
+        ok, error = check_database_ready()
+        if ok:
             return jsonify({
-                'status': 'healthy',
+                'status': 'ready',
                 'service': 'Energy Insights API',
                 'database': 'connected',
                 'timestamp': Config.DATA_END_DATE.isoformat()
             }), 200
-        except Exception as e:
-            logger.error(f"Health check failed: {str(e)}")
-            return jsonify({
-                'status': 'unhealthy',
-                'service': 'Energy Insights API',
-                'database': 'disconnected',
-                'error': str(e)
-            }), 503
+        return jsonify({
+            'status': 'unavailable',
+            'service': 'Energy Insights API',
+            'database': 'disconnected',
+            'error': error
+        }), 503
     
     @app.errorhandler(404)
     def not_found(error):
@@ -102,6 +123,6 @@ def create_app(config_class=Config):
     return app
 
 if __name__ == '__main__':
-    app = create_app()
-    logger.info("Starting Flask development server...")
-    app.run(debug=True, host='0.0.0.0', port=5001)
\ No newline at end of file
+    import uvicorn
+    logger.info("Starting Uvicorn development server...")
+    uvicorn.run('asgi:app', host='0.0.0.0', port=5001, reload=Config.DEBUG)
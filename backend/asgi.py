@@ -0,0 +1,16 @@
+"""
+ASGI entry point for production deployment
+Usage: uvicorn asgi:app --host 0.0.0.0 --port 5000 --workers 4
+"""
+
+from a2wsgi import WSGIMiddleware
+from app import create_app
+from config import Config
+
+# Each request runs on its own thread from a pool of ASGI_THREADS, so requests
+# waiting on Supabase don't hold up the event loop or each other
+app = WSGIMiddleware(create_app(), workers=Config.ASGI_THREADS)
+
+if __name__ == "__main__":
+    import uvicorn
+    uvicorn.run("asgi:app", host="0.0.0.0", port=5000, workers=4)
@@ -18,6 +18,13 @@ class Config:
         'No'
     )
     
+    # Supabase HTTP connection pool
+    SUPABASE_MAX_CONNECTIONS = int(os.getenv('SUPABASE_MAX_CONNECTIONS', 20))
+    SUPABASE_MAX_KEEPALIVE_CONNECTIONS = int(os.getenv('SUPABASE_MAX_KEEPALIVE_CONNECTIONS', 10))
+    SUPABASE_KEEPALIVE_EXPIRY = 30  # Seconds an idle connection stays open
+    SUPABASE_CONNECT_TIMEOUT = 10  # Seconds to establish a new connection
+    SUPABASE_POOL_TIMEOUT = 30  # Seconds to wait for a free pooled connection
+    
     # Data Generation Settings
     NUM_BUILDINGS = 15
     NUM_WEATHER_STATIONS = 3
@@ -25,6 +32,9 @@ class Config:
     DATA_START_DATE = datetime(2023, 1, 1)
     DATA_END_DATE = datetime.now()
     NUM_MONTHS = 24
+    DB_INSERT_BATCH_SIZE = 1000  # Rows per bulk insert request
+    # Seed for synthetic data generators; unset draws fresh data on every run
+    DATA_RANDOM_SEED = int(os.getenv('DATA_RANDOM_SEED')) if os.getenv('DATA_RANDOM_SEED') else None
     
     # Boston Geographic Bounds
     BOSTON_BOUNDS = {
@@ -58,9 +68,13 @@ class Config:
     WEATHER_BASE_TEMP = 65  # Base temperature for degree days (°F)
     WEATHER_API_KEY = os.getenv('WEATHER_API_KEY', '')  # Optional: real weather data
     WEATHER_API_URL = 'https://api.openweathermap.org/data/2.5'
+    OPENMETEO_TIMEOUT = 5  # Seconds before an OpenMeteo request is abandoned
+    OPENMETEO_CURRENT_TTL = 300  # Seconds to reuse OpenMeteo current conditions
+    OPENMETEO_FORECAST_TTL = 1800  # Seconds to reuse the OpenMeteo hourly forecast
     
     # Gemini AI Configuration
     GEMINI_API_KEY = os.getenv('GEMINI_API_KEY', '')
+    GEMINI_MODEL = 'gemini-2.5-flash'
     
     # Traffic Configuration
     TRAFFIC_TIME_PERIODS = [
@@ -90,15 +104,32 @@ class Config:
     ANOMALY_ZSCORE_THRESHOLD = 2.5
     WEATHER_CORRELATION_THRESHOLD = 0.7  # R² for weather impact
     TRAFFIC_CORRELATION_THRESHOLD = 0.6  # R² for traffic impact
+    INSIGHTS_MAX_CONCURRENCY = 5  # Buildings analyzed in parallel
+    INSIGHTS_BUILDING_BATCH_SIZE = 500  # Buildings loaded and analyzed per batch when generating for all
+    SUGGESTIONS_CACHE_TTL = 3600  # Seconds to reuse Gemini suggestions generated from identical data
+    
+    # Simulation Settings
+    POOP_ALERT_INTERVAL = 3600  # Seconds between alert emails to the same user
     
     # API Settings
     MAX_PAGE_SIZE = 100
     DEFAULT_PAGE_SIZE = 25
+    READINGS_PAGE_SIZE = 1000  # Default page of readings for a single building
+    MAX_READINGS_PAGE_SIZE = 1000  # PostgREST's max-rows; it silently truncates larger pages
     REQUEST_TIMEOUT = 30
+    ASGI_THREADS = int(os.getenv('ASGI_THREADS', 20))  # Requests served concurrently per ASGI worker
+    HEALTH_CACHE_TTL = 15  # Seconds to reuse a readiness probe result
+    STATIC_RESPONSE_MAX_AGE = 86400  # Seconds clients may cache responses built only from constants
+    COMPRESS_MIN_SIZE = 500  # Smallest JSON/text body worth gzipping, in bytes
+    COMPRESS_LEVEL = 6
+    
+    # Response cache for GET endpoints; set CACHE_TYPE=RedisCache to share it across workers
+    CACHE_TYPE = os.getenv('CACHE_TYPE', 'SimpleCache')
+    CACHE_REDIS_URL = os.getenv('CACHE_REDIS_URL', 'redis://localhost:6379/0')
+    CACHE_DEFAULT_TIMEOUT = 60
+    DASHBOARD_CACHE_FRESH = 30  # Seconds a dashboard aggregate is served as-is
+    DASHBOARD_CACHE_STALE = 300  # Further seconds it is served while refreshing in the background
     
     # CORS Settings
-    CORS_ORIGINS = [
-        'http://localhost:5173',
-        'http://localhost:3000',
-        'http://localhost:5174'
-    ]
\ No newline at end of file
+    # Comma-separated list, e.g. 'http://localhost:5173,http://localhost:3000'
+    CORS_ORIGINS = os.getenv('CORS_ORIGINS', '*').split(',')
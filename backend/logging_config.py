@@ -0,0 +1,27 @@
+import atexit
+import logging
+import queue
+from logging.handlers import QueueHandler, QueueListener
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+
+def configure_logging(level: int = logging.INFO) -> None:
+    """Attach a single queue-backed handler to the root logger; repeat calls are no-ops"""
+    root = logging.getLogger()
+    
+    # Checked on the root logger rather than a module flag, so this holds even
+    # if the module is imported under two names
+    if any(isinstance(handler, QueueHandler) for handler in root.handlers):
+        return
+    
+    # Formatting and stream writes happen on the listener thread, not in requests
+    stream_handler = logging.StreamHandler()
+    stream_handler.setFormatter(logging.Formatter(LOG_FORMAT))
+    
+    log_queue = queue.SimpleQueue()
+    listener = QueueListener(log_queue, stream_handler, respect_handler_level=True)
+    listener.start()
+    atexit.register(listener.stop)
+    
+    root.addHandler(QueueHandler(log_queue))
+    root.setLevel(level)
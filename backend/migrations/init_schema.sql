@@ -101,6 +101,10 @@ CREATE TABLE IF NOT EXISTS insights (
     title TEXT NOT NULL,
     description TEXT NOT NULL,
     priority TEXT DEFAULT 'medium',
+    -- Sort key for priority, most urgent first; text order would put 'low' before 'medium'
+    priority_rank SMALLINT GENERATED ALWAYS AS (
+        CASE priority WHEN 'critical' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END
+    ) STORED,
     category TEXT,
     potential_savings DOUBLE PRECISION,
     confidence_score DOUBLE PRECISION,
@@ -113,15 +117,27 @@ CREATE TABLE IF NOT EXISTS insights (
     CONSTRAINT valid_confidence CHECK (confidence_score >= 0 AND confidence_score <= 100)
 );
 
+-- Tables created before priority_rank existed get it here, so re-running the file adds it
+ALTER TABLE insights ADD COLUMN IF NOT EXISTS priority_rank SMALLINT GENERATED ALWAYS AS (
+    CASE priority WHEN 'critical' THEN 0 WHEN 'high' THEN 1 WHEN 'medium' THEN 2 ELSE 3 END
+) STORED;
+
 -- ============================================
 -- INDEXES FOR PERFORMANCE
 -- ============================================
 
 -- Energy indexes
 CREATE INDEX IF NOT EXISTS idx_energy_readings_building ON energy_readings(building_id);
-CREATE INDEX IF NOT EXISTS idx_energy_readings_date ON energy_readings(reading_date);
-CREATE INDEX IF NOT EXISTS idx_energy_readings_fuel_type ON energy_readings(fuel_type);
-CREATE INDEX IF NOT EXISTS idx_energy_readings_building_date ON energy_readings(building_id, reading_date);
+-- Covers the recent usage/cost scans behind the dashboards as index-only scans
+CREATE INDEX IF NOT EXISTS idx_energy_readings_date_id ON energy_readings(reading_date, id) INCLUDE (usage, cost);
+-- Serves fuel-filtered reading pages in (reading_date, id) order without a sort
+CREATE INDEX IF NOT EXISTS idx_energy_readings_fuel_date_id ON energy_readings(fuel_type, reading_date, id);
+-- Serves per-building reading pages in (reading_date, id) order without a sort
+CREATE INDEX IF NOT EXISTS idx_energy_readings_building_date_id ON energy_readings(building_id, reading_date, id);
+-- Superseded by the indexes above
+DROP INDEX IF EXISTS idx_energy_readings_date;
+DROP INDEX IF EXISTS idx_energy_readings_fuel_type;
+DROP INDEX IF EXISTS idx_energy_readings_building_date;
 
 -- Weather indexes
 CREATE INDEX IF NOT EXISTS idx_weather_data_station ON weather_data(station_id);
@@ -130,15 +146,43 @@ CREATE INDEX IF NOT EXISTS idx_weather_data_station_date ON weather_data(station
 
 -- Traffic indexes
 CREATE INDEX IF NOT EXISTS idx_traffic_data_intersection ON traffic_data(intersection_id);
-CREATE INDEX IF NOT EXISTS idx_traffic_data_timestamp ON traffic_data(reading_timestamp);
-CREATE INDEX IF NOT EXISTS idx_traffic_data_time_period ON traffic_data(time_period);
-CREATE INDEX IF NOT EXISTS idx_traffic_data_intersection_time ON traffic_data(intersection_id, reading_timestamp);
+-- Serves traffic data pages in (reading_timestamp, id) order without a sort; the
+-- included columns make the summary and latest-readings scans index-only
+CREATE INDEX IF NOT EXISTS idx_traffic_data_timestamp_id ON traffic_data(reading_timestamp, id)
+    INCLUDE (total_vehicle_count, average_speed, congestion_level, time_period);
+-- Same order for pages filtered by time period or by intersection
+CREATE INDEX IF NOT EXISTS idx_traffic_data_time_period_timestamp_id ON traffic_data(time_period, reading_timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_traffic_data_intersection_timestamp_id ON traffic_data(intersection_id, reading_timestamp, id);
+-- Superseded by the indexes above
+DROP INDEX IF EXISTS idx_traffic_data_timestamp;
+DROP INDEX IF EXISTS idx_traffic_data_time_period;
+DROP INDEX IF EXISTS idx_traffic_data_intersection_time;
 
 -- Insights indexes
-CREATE INDEX IF NOT EXISTS idx_insights_type ON insights(insight_type);
-CREATE INDEX IF NOT EXISTS idx_insights_entity ON insights(entity_type, entity_id);
-CREATE INDEX IF NOT EXISTS idx_insights_priority ON insights(priority);
+-- Each filter of the insights list paired with its newest-first order, so
+-- filtered pages are read straight off the index without a sort
+CREATE INDEX IF NOT EXISTS idx_insights_type_created ON insights(insight_type, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_insights_priority_created ON insights(priority, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_insights_type_priority_created ON insights(insight_type, priority, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_insights_entity_created ON insights(entity_type, entity_id, created_at DESC);
+CREATE INDEX IF NOT EXISTS idx_insights_entity_priority ON insights(entity_type, entity_id, priority_rank, created_at DESC);
 CREATE INDEX IF NOT EXISTS idx_insights_created ON insights(created_at DESC);
+-- Superseded by the indexes above; (priority, created_at DESC) also serves the
+-- newest high-priority insights the partial index was built for
+DROP INDEX IF EXISTS idx_insights_type;
+DROP INDEX IF EXISTS idx_insights_entity;
+DROP INDEX IF EXISTS idx_insights_priority;
+DROP INDEX IF EXISTS idx_insights_high_priority_created;
+
+-- Simulation indexes
+-- Latest alert per user for the poop alert rate limit, read from the index alone.
+-- poop_alerts is created outside this schema, so only index it where it exists
+DO $$
+BEGIN
+    IF to_regclass('public.poop_alerts') IS NOT NULL THEN
+        CREATE INDEX IF NOT EXISTS idx_poop_alerts_user_created ON poop_alerts(user_id, created_at DESC);
+    END IF;
+END $$;
 
 -- ============================================
 -- VIEWS FOR COMMON QUERIES
@@ -307,25 +351,310 @@ BEGIN
 END;
 $$ LANGUAGE plpgsql;
 
+-- Function: Energy usage and cost totals per fuel type
+CREATE OR REPLACE FUNCTION energy_totals_by_fuel()
+RETURNS TABLE(
+    fuel_type TEXT,
+    usage DOUBLE PRECISION,
+    cost DOUBLE PRECISION,
+    count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        er.fuel_type,
+        SUM(er.usage) as usage,
+        SUM(er.cost) as cost,
+        COUNT(*) as count
+    FROM energy_readings er
+    GROUP BY er.fuel_type;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Function: Number of buildings per category
+CREATE OR REPLACE FUNCTION buildings_by_category()
+RETURNS TABLE(
+    category TEXT,
+    count BIGINT
+) AS $$
+BEGIN
+    RETURN QUERY
+    SELECT 
+        eb.category,
+        COUNT(*) as count
+    FROM energy_buildings eb
+    GROUP BY eb.category;
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Function: Dashboard card statistics over the most recent readings of each kind
+CREATE OR REPLACE FUNCTION dashboard_stats(
+    p_energy_limit INTEGER DEFAULT 1000,
+    p_weather_limit INTEGER DEFAULT 100,
+    p_traffic_limit INTEGER DEFAULT 1000
+)
+RETURNS TABLE(
+    total_usage DOUBLE PRECISION,
+    total_cost DOUBLE PRECISION,
+    avg_temperature DOUBLE PRECISION,
+    total_hdd BIGINT,
+    total_cdd BIGINT,
+    total_vehicles BIGINT,
+    avg_speed DOUBLE PRECISION,
+    total_insights BIGINT,
+    high_priority BIGINT,
+    potential_savings DOUBLE PRECISION
+) AS $$
+    SELECT 
+        e.total_usage,
+        e.total_cost,
+        w.avg_temperature,
+        w.total_hdd,
+        w.total_cdd,
+        t.total_vehicles,
+        t.avg_speed,
+        i.total_insights,
+        i.high_priority,
+        i.potential_savings
+    FROM (
+        SELECT 
+            COALESCE(SUM(er.usage), 0) as total_usage,
+            COALESCE(SUM(er.cost), 0) as total_cost
+        FROM (
+            SELECT usage, cost FROM energy_readings
+            ORDER BY reading_date DESC LIMIT p_energy_limit
+        ) er
+    ) e
+    CROSS JOIN (
+        SELECT 
+            COALESCE(AVG(wd.temp_avg), 0) as avg_temperature,
+            COALESCE(SUM(wd.heating_degree_days), 0) as total_hdd,
+            COALESCE(SUM(wd.cooling_degree_days), 0) as total_cdd
+        FROM (
+            SELECT temp_avg, heating_degree_days, cooling_degree_days FROM weather_data
+            ORDER BY reading_date DESC LIMIT p_weather_limit
+        ) wd
+    ) w
+    CROSS JOIN (
+        SELECT 
+            COALESCE(SUM(td.total_vehicle_count), 0) as total_vehicles,
+            COALESCE(AVG(td.average_speed), 0) as avg_speed
+        FROM (
+            SELECT total_vehicle_count, average_speed FROM traffic_data
+            ORDER BY reading_timestamp DESC LIMIT p_traffic_limit
+        ) td
+    ) t
+    CROSS JOIN (
+        SELECT 
+            COUNT(*) as total_insights,
+            COUNT(*) FILTER (WHERE ins.priority = 'high') as high_priority,
+            COALESCE(SUM(ins.potential_savings), 0) as potential_savings
+        FROM insights ins
+    ) i;
+$$ LANGUAGE sql STABLE;
+
+-- Function: Dashboard overview document (table counts, recent energy totals,
+-- latest high priority insights) assembled in one call
+CREATE OR REPLACE FUNCTION dashboard_overview(
+    p_energy_limit INTEGER DEFAULT 100,
+    p_insight_limit INTEGER DEFAULT 5
+)
+RETURNS JSONB AS $$
+    WITH counts AS (
+        SELECT 
+            (SELECT COUNT(*) FROM energy_buildings) as buildings,
+            (SELECT COUNT(*) FROM weather_stations) as weather_stations,
+            (SELECT COUNT(*) FROM traffic_intersections) as traffic_intersections,
+            (SELECT COUNT(*) FROM insights) as total_insights
+    ),
+    energy AS (
+        SELECT 
+            COALESCE(SUM(er.usage), 0) as total_usage,
+            COALESCE(SUM(er.cost), 0) as total_cost
+        FROM (
+            SELECT usage, cost FROM energy_readings
+            ORDER BY reading_date DESC LIMIT p_energy_limit
+        ) er
+    )
+    SELECT jsonb_build_object(
+        'counts', jsonb_build_object(
+            'buildings', c.buildings,
+            'weather_stations', c.weather_stations,
+            'traffic_intersections', c.traffic_intersections,
+            'total_insights', c.total_insights
+        ),
+        'energy_summary', jsonb_build_object(
+            'total_usage', ROUND(e.total_usage::NUMERIC, 2),
+            'total_cost', ROUND(e.total_cost::NUMERIC, 2),
+            'avg_usage_per_building', COALESCE(ROUND((e.total_usage / NULLIF(c.buildings, 0))::NUMERIC, 2), 0)
+        ),
+        'high_priority_insights', COALESCE((
+            SELECT jsonb_agg(to_jsonb(ins) ORDER BY ins.created_at DESC)
+            FROM (
+                SELECT * FROM insights
+                WHERE priority = 'high'
+                ORDER BY created_at DESC LIMIT p_insight_limit
+            ) ins
+        ), '[]'::jsonb)
+    )
+    FROM counts c
+    CROSS JOIN energy e;
+$$ LANGUAGE sql STABLE;
+
+-- Function: Insight counts by priority and type with total potential savings
+CREATE OR REPLACE FUNCTION insights_summary()
+RETURNS JSONB AS $$
+    SELECT jsonb_build_object(
+        'total_insights', (SELECT COUNT(*) FROM insights),
+        'by_priority', COALESCE((
+            SELECT jsonb_object_agg(COALESCE(p.priority, 'null'), p.count)
+            FROM (SELECT priority, COUNT(*) as count FROM insights GROUP BY priority) p
+        ), '{}'::jsonb),
+        'by_type', COALESCE((
+            SELECT jsonb_object_agg(t.insight_type, t.count)
+            FROM (SELECT insight_type, COUNT(*) as count FROM insights GROUP BY insight_type) t
+        ), '{}'::jsonb),
+        'total_potential_savings', (
+            SELECT ROUND(COALESCE(SUM(potential_savings), 0)::NUMERIC, 2) FROM insights
+        )
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Function: Inputs for the city optimization prompt - energy totals over the
+-- latest readings and congestion level counts per time period over the latest traffic
+CREATE OR REPLACE FUNCTION suggestion_inputs(
+    p_energy_limit INTEGER DEFAULT 1000,
+    p_traffic_limit INTEGER DEFAULT 1000
+)
+RETURNS JSONB AS $$
+    WITH energy AS (
+        SELECT usage, cost FROM energy_readings
+        ORDER BY reading_date DESC LIMIT p_energy_limit
+    ),
+    traffic AS (
+        SELECT 
+            COALESCE(time_period, 'unknown') as time_period,
+            COALESCE(congestion_level, 'unknown') as congestion_level
+        FROM traffic_data
+        ORDER BY reading_timestamp DESC LIMIT p_traffic_limit
+    ),
+    traffic_periods AS (
+        SELECT tl.time_period, jsonb_object_agg(tl.congestion_level, tl.count) as levels
+        FROM (
+            SELECT time_period, congestion_level, COUNT(*) as count
+            FROM traffic
+            GROUP BY time_period, congestion_level
+        ) tl
+        GROUP BY tl.time_period
+    )
+    SELECT jsonb_build_object(
+        'energy_readings', (SELECT COUNT(*) FROM energy),
+        'total_usage', (SELECT COALESCE(SUM(usage), 0) FROM energy),
+        'total_cost', (SELECT COALESCE(SUM(cost), 0) FROM energy),
+        'traffic_readings', (SELECT COUNT(*) FROM traffic),
+        'traffic_by_period', COALESCE((SELECT jsonb_object_agg(time_period, levels) FROM traffic_periods), '{}'::jsonb)
+    );
+$$ LANGUAGE sql STABLE;
+
+-- Function: Traffic totals, average speed and readings per congestion level,
+-- optionally limited to a reading_timestamp range
+CREATE OR REPLACE FUNCTION traffic_summary(
+    p_start TIMESTAMP DEFAULT NULL,
+    p_end TIMESTAMP DEFAULT NULL
+)
+RETURNS JSONB AS $$
+    WITH readings AS (
+        SELECT total_vehicle_count, average_speed, congestion_level
+        FROM traffic_data
+        WHERE (p_start IS NULL OR reading_timestamp >= p_start)
+          AND (p_end IS NULL OR reading_timestamp <= p_end)
+    )
+    SELECT jsonb_build_object(
+        'total_vehicle_count', COALESCE(SUM(total_vehicle_count), 0),
+        'average_speed', COALESCE(ROUND(AVG(average_speed)::NUMERIC, 2), 0),
+        'congestion_distribution', COALESCE((
+            SELECT jsonb_object_agg(l.congestion_level, l.count)
+            FROM (SELECT congestion_level, COUNT(*) as count FROM readings GROUP BY congestion_level) l
+        ), '{}'::jsonb),
+        'records_count', COUNT(*)
+    )
+    FROM readings;
+$$ LANGUAGE sql STABLE;
+
+-- Function: Weather summary for a date range, or NULL when it has no readings
+CREATE OR REPLACE FUNCTION weather_summary(
+    p_start DATE,
+    p_end DATE
+)
+RETURNS JSONB AS $$
+    SELECT CASE WHEN COUNT(*) = 0 THEN NULL ELSE jsonb_build_object(
+        'avg_temperature', ROUND(AVG(temp_avg)::NUMERIC, 1),
+        'min_temperature', ROUND(MIN(temp_min)::NUMERIC, 1),
+        'max_temperature', ROUND(MAX(temp_max)::NUMERIC, 1),
+        'total_heating_degree_days', SUM(heating_degree_days),
+        'total_cooling_degree_days', SUM(cooling_degree_days),
+        'total_precipitation', ROUND(SUM(precipitation)::NUMERIC, 2),
+        'avg_humidity', ROUND(AVG(humidity)::NUMERIC, 1),
+        'avg_wind_speed', ROUND(AVG(wind_speed)::NUMERIC, 1),
+        'days', COUNT(*)
+    ) END
+    FROM weather_data
+    WHERE reading_date BETWEEN p_start AND p_end;
+$$ LANGUAGE sql STABLE;
+
+-- Function: Every simulation weather row as one JSON array, ordered by id.
+-- "Weather" is created outside this schema, so plpgsql resolves it on first call
+CREATE OR REPLACE FUNCTION all_weather()
+RETURNS JSON AS $$
+BEGIN
+    RETURN (SELECT COALESCE(json_agg(w ORDER BY w.id), '[]'::json) FROM "Weather" w);
+END;
+$$ LANGUAGE plpgsql STABLE;
+
+-- Superseded by clear_all_data(). Older databases still have it, and it was
+-- callable by anyone, so drop it
+DROP FUNCTION IF EXISTS truncate_insights();
+
+-- Function: Empty every data table in one statement, without per-row deletes
+CREATE OR REPLACE FUNCTION clear_all_data()
+RETURNS VOID AS $$
+BEGIN
+    TRUNCATE TABLE
+        insights,
+        traffic_data,
+        weather_data,
+        energy_readings,
+        traffic_intersections,
+        weather_stations,
+        energy_buildings
+    RESTART IDENTITY CASCADE;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+REVOKE ALL ON FUNCTION clear_all_data() FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION clear_all_data() TO service_role;
+
 -- ============================================
 -- INITIAL DATA CONSTRAINTS
 -- ============================================
 
+-- Each constraint is dropped and re-added so the whole file can be re-run
+
 -- Ensure valid coordinates (Boston area)
-ALTER TABLE energy_buildings ADD CONSTRAINT valid_building_coords 
+ALTER TABLE energy_buildings DROP CONSTRAINT IF EXISTS valid_building_coords, ADD CONSTRAINT valid_building_coords 
     CHECK (latitude BETWEEN 42.2 AND 42.4 AND longitude BETWEEN -71.2 AND -70.9);
 
-ALTER TABLE weather_stations ADD CONSTRAINT valid_station_coords 
+ALTER TABLE weather_stations DROP CONSTRAINT IF EXISTS valid_station_coords, ADD CONSTRAINT valid_station_coords 
     CHECK (latitude BETWEEN 42.2 AND 42.4 AND longitude BETWEEN -71.2 AND -70.9);
 
-ALTER TABLE traffic_intersections ADD CONSTRAINT valid_intersection_coords 
+ALTER TABLE traffic_intersections DROP CONSTRAINT IF EXISTS valid_intersection_coords, ADD CONSTRAINT valid_intersection_coords 
     CHECK (latitude BETWEEN 42.2 AND 42.4 AND longitude BETWEEN -71.2 AND -70.9);
 
 -- Ensure positive values
-ALTER TABLE energy_readings ADD CONSTRAINT positive_usage CHECK (usage >= 0);
-ALTER TABLE energy_readings ADD CONSTRAINT positive_cost CHECK (cost >= 0);
-ALTER TABLE traffic_data ADD CONSTRAINT positive_vehicle_count CHECK (total_vehicle_count >= 0);
-ALTER TABLE traffic_data ADD CONSTRAINT positive_speed CHECK (average_speed >= 0);
+ALTER TABLE energy_readings DROP CONSTRAINT IF EXISTS positive_usage, ADD CONSTRAINT positive_usage CHECK (usage >= 0);
+ALTER TABLE energy_readings DROP CONSTRAINT IF EXISTS positive_cost, ADD CONSTRAINT positive_cost CHECK (cost >= 0);
+ALTER TABLE traffic_data DROP CONSTRAINT IF EXISTS positive_vehicle_count, ADD CONSTRAINT positive_vehicle_count CHECK (total_vehicle_count >= 0);
+ALTER TABLE traffic_data DROP CONSTRAINT IF EXISTS positive_speed, ADD CONSTRAINT positive_speed CHECK (average_speed >= 0);
 
 -- ============================================
 -- COMMENTS FOR DOCUMENTATION
@@ -357,6 +686,18 @@ GRANT SELECT ON ALL TABLES IN SCHEMA public TO anon;
 GRANT ALL ON ALL TABLES IN SCHEMA public TO authenticated;
 GRANT USAGE, SELECT ON ALL SEQUENCES IN SCHEMA public TO authenticated;
 
+-- Runs this whole file in one call from run_migrations.py. It executes arbitrary
+-- SQL as its owner, so only the service role may call it
+CREATE OR REPLACE FUNCTION exec_sql(sql TEXT)
+RETURNS VOID AS $$
+BEGIN
+    EXECUTE sql;
+END;
+$$ LANGUAGE plpgsql SECURITY DEFINER SET search_path = public, pg_temp;
+
+REVOKE ALL ON FUNCTION exec_sql(TEXT) FROM PUBLIC, anon, authenticated;
+GRANT EXECUTE ON FUNCTION exec_sql(TEXT) TO service_role;
+
 -- ============================================
 -- SEED DATA (Optional - for testing)
 -- ============================================
@@ -2,7 +2,7 @@
 Data models for the Boston Energy Insights application
 """
 
-from .energy import EnergyBuilding, EnergyReading
+from .energy import EnergyBuilding, EnergyReading, ReadingBatch
 from .weather import WeatherStation, WeatherData
 from .traffic import TrafficIntersection, TrafficData
 from .insights import Insight
@@ -10,6 +10,7 @@ from .insights import Insight
 __all__ = [
     'EnergyBuilding',
     'EnergyReading',
+    'ReadingBatch',
     'WeatherStation',
     'WeatherData',
     'TrafficIntersection',
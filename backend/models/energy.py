@@ -1,8 +1,9 @@
 from dataclasses import dataclass
-from typing import Optional
+from typing import List, Optional
 from datetime import datetime
+import numpy as np
 
-@dataclass
+@dataclass(slots=True)
 class EnergyBuilding:
     """Energy building data model"""
     name: str
@@ -45,7 +46,7 @@ class EnergyBuilding:
             created_at=data.get('created_at')
         )
 
-@dataclass
+@dataclass(slots=True)
 class EnergyReading:
     """Energy reading data model"""
     building_id: int
@@ -77,4 +78,24 @@ class EnergyReading:
             usage=data['usage'],
             cost=data['cost'],
             created_at=data.get('created_at')
-        )
\ No newline at end of file
+        )
+
+@dataclass(slots=True)
+class ReadingBatch:
+    """Column-oriented view over energy reading rows for numeric analysis"""
+    building_id: np.ndarray
+    usage: np.ndarray
+    cost: np.ndarray
+    
+    def __len__(self) -> int:
+        return len(self.usage)
+    
+    @staticmethod
+    def from_dicts(rows: List[dict]) -> 'ReadingBatch':
+        """Build contiguous arrays from reading dictionaries"""
+        n = len(rows)
+        return ReadingBatch(
+            building_id=np.fromiter((r['building_id'] for r in rows), dtype=np.int64, count=n),
+            usage=np.fromiter((r['usage'] for r in rows), dtype=np.float64, count=n),
+            cost=np.fromiter((r['cost'] for r in rows), dtype=np.float64, count=n)
+        )
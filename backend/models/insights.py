@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional, List, Dict, Any
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class Insight:
     """Cross-domain insight data model"""
     insight_type: str  # 'energy', 'weather', 'traffic', 'cross_domain'
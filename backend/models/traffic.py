@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional, List
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class TrafficIntersection:
     """Traffic intersection data model"""
     name: str
@@ -31,7 +31,7 @@ class TrafficIntersection:
             created_at=data.get('created_at')
         )
 
-@dataclass
+@dataclass(slots=True)
 class TrafficData:
     """Traffic data reading model with directional counts"""
     intersection_id: int
@@ -2,7 +2,7 @@ from dataclasses import dataclass
 from typing import Optional
 from datetime import datetime
 
-@dataclass
+@dataclass(slots=True)
 class WeatherStation:
     """Weather station data model"""
     name: str
@@ -28,7 +28,7 @@ class WeatherStation:
             created_at=data.get('created_at')
         )
 
-@dataclass
+@dataclass(slots=True)
 class WeatherData:
     """Weather data reading model"""
     station_id: int
@@ -1,20 +1,38 @@
 from flask import Blueprint, request, jsonify
-from services.energy_generator import EnergyDataGenerator
+from concurrent.futures import ThreadPoolExecutor
+from services.energy_generator import get_energy_generator
 from utils.supabase_client import SupabaseClient
+from utils.cache import cache, is_success, stale_while_revalidate
+from utils.responses import ojsonify, stream_rows, static_json, static_response
+from utils.helpers import parse_int_arg, next_page_offset
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 energy_bp = Blueprint('energy', __name__)
 db = SupabaseClient()
+client = db.get_client()
+
+# Runs independent Supabase queries of one request side by side
+_query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='energy-query')
+
+# Built only from constants, so encode them once at import
+_CATEGORIES_BODY = static_json({'success': True, 'categories': Config.BUILDING_CATEGORIES})
+_FUEL_TYPES_BODY = static_json({'success': True, 'fuel_types': Config.FUEL_TYPES})
 
 @energy_bp.route('/buildings', methods=['GET'])
+@cache.cached(query_string=True, response_filter=is_success)
 def get_buildings():
     """Get all buildings with optional filters"""
+    try:
+        limit = parse_int_arg(request.args, 'limit', Config.MAX_PAGE_SIZE, minimum=1, maximum=Config.MAX_PAGE_SIZE)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     try:
         category = request.args.get('category')
-        limit = int(request.args.get('limit', 100))
         
-        query = db.get_client().table('energy_buildings').select('*')
+        query = client.table('energy_buildings').select('*')
         
         if category:
             query = query.eq('category', category)
@@ -35,12 +53,16 @@ def get_buildings():
 def get_building(building_id):
     """Get specific building details"""
     try:
-        response = db.get_client().table('energy_buildings')\
+        response = client.table('energy_buildings')\
             .select('*')\
             .eq('id', building_id)\
-            .single()\
+            .maybe_single()\
             .execute()
         
+        # maybe_single returns no response at all when the row doesn't exist
+        if response is None:
+            return jsonify({'success': False, 'error': f'Building {building_id} not found'}), 404
+        
         return jsonify({
             'success': True,
             'building': response.data
@@ -48,17 +70,24 @@ def get_building(building_id):
         
     except Exception as e:
         logger.error(f"Error fetching building {building_id}: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 404
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @energy_bp.route('/buildings/<int:building_id>/readings', methods=['GET'])
+@cache.cached(query_string=True, response_filter=is_success)
 def get_building_readings(building_id):
     """Get energy readings for a specific building"""
+    try:
+        limit = parse_int_arg(request.args, 'limit', Config.READINGS_PAGE_SIZE, minimum=1, maximum=Config.MAX_READINGS_PAGE_SIZE)
+        offset = parse_int_arg(request.args, 'offset', 0)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         fuel_type = request.args.get('fuel_type')
         
-        query = db.get_client().table('energy_readings')\
+        query = client.table('energy_readings')\
             .select('*')\
             .eq('building_id', building_id)
         
@@ -69,13 +98,19 @@ def get_building_readings(building_id):
         if fuel_type:
             query = query.eq('fuel_type', fuel_type)
         
-        response = query.order('reading_date').execute()
+        # id breaks ties between fuel types on the same date so pages never overlap
+        response = query.order('reading_date')\
+            .order('id')\
+            .range(offset, offset + limit - 1)\
+            .execute()
         
-        return jsonify({
+        # Pages are bounded and cached, so encode once with orjson rather than stream
+        return ojsonify({
             'success': True,
             'count': len(response.data),
-            'readings': response.data
-        }), 200
+            'readings': response.data,
+            'next_offset': next_page_offset(offset, len(response.data), limit)
+        })
         
     except Exception as e:
         logger.error(f"Error fetching readings for building {building_id}: {str(e)}")
@@ -84,13 +119,19 @@ def get_building_readings(building_id):
 @energy_bp.route('/readings', methods=['GET'])
 def get_all_readings():
     """Get all energy readings with optional filters"""
+    try:
+        limit = parse_int_arg(request.args, 'limit', Config.READINGS_PAGE_SIZE, minimum=1, maximum=Config.MAX_READINGS_PAGE_SIZE)
+        offset = parse_int_arg(request.args, 'offset', 0)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     try:
         start_date = request.args.get('start_date')
         end_date = request.args.get('end_date')
         fuel_type = request.args.get('fuel_type')
-        limit = int(request.args.get('limit', 1000))
         
-        query = db.get_client().table('energy_readings').select('*')
+        # Only the first page pays for the exact total
+        query = client.table('energy_readings').select('*', count='exact' if offset == 0 else None)
         
         if start_date:
             query = query.gte('reading_date', start_date)
@@ -99,56 +140,69 @@ def get_all_readings():
         if fuel_type:
             query = query.eq('fuel_type', fuel_type)
         
-        response = query.limit(limit).order('reading_date').execute()
+        response = query.order('reading_date')\
+            .order('id')\
+            .range(offset, offset + limit - 1)\
+            .execute()
         
-        return jsonify({
-            'success': True,
+        # The first page knows the exact total, so it never mistakes a truncated page for the last
+        fields = {
             'count': len(response.data),
-            'readings': response.data
-        }), 200
+            'next_offset': next_page_offset(offset, len(response.data), limit, response.count)
+        }
+        if offset == 0:
+            fields['total'] = response.count
+        return stream_rows('readings', response.data, **fields)
         
     except Exception as e:
         logger.error(f"Error fetching readings: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
 @energy_bp.route('/dashboard-data', methods=['GET'])
+@stale_while_revalidate(Config.DASHBOARD_CACHE_FRESH, Config.DASHBOARD_CACHE_STALE)
 def get_dashboard_data():
     """Get aggregated dashboard metrics for energy"""
     try:
-        # Get all buildings
-        buildings_response = db.get_client().table('energy_buildings').select('*').execute()
-        buildings = buildings_response.data
-        
-        # Get all readings
-        readings_response = db.get_client().table('energy_readings').select('*').execute()
-        readings = readings_response.data
+        # Building counts per category and per-fuel totals are both aggregated
+        # in the database and independent, so fetch them concurrently
+        categories_future = _query_pool.submit(
+            client.rpc('buildings_by_category').execute
+        )
+        totals_future = _query_pool.submit(
+            client.rpc('energy_totals_by_fuel').execute
+        )
+        buildings_by_category = {
+            row['category']: row['count']
+            for row in categories_future.result().data
+        }
+        totals_response = totals_future.result()
+        total_buildings = sum(buildings_by_category.values())
+        
+        fuel_breakdown = {
+            row['fuel_type']: {
+                'usage': row['usage'] or 0,
+                'cost': row['cost'] or 0,
+                'count': row['count']
+            }
+            for row in totals_response.data
+        }
         
         # Calculate aggregated metrics
-        total_usage = sum(r['usage'] for r in readings)
-        total_cost = sum(r['cost'] for r in readings)
-        
-        # Group by fuel type
-        fuel_breakdown = {}
-        for reading in readings:
-            fuel_type = reading['fuel_type']
-            if fuel_type not in fuel_breakdown:
-                fuel_breakdown[fuel_type] = {'usage': 0, 'cost': 0, 'count': 0}
-            fuel_breakdown[fuel_type]['usage'] += reading['usage']
-            fuel_breakdown[fuel_type]['cost'] += reading['cost']
-            fuel_breakdown[fuel_type]['count'] += 1
+        total_usage = sum(fuel['usage'] for fuel in fuel_breakdown.values())
+        total_cost = sum(fuel['cost'] for fuel in fuel_breakdown.values())
         
         # Calculate average usage per building
-        avg_usage_per_building = total_usage / len(buildings) if buildings else 0
+        avg_usage_per_building = total_usage / total_buildings if total_buildings else 0
         
         return jsonify({
             'success': True,
             'data': {
-                'total_buildings': len(buildings),
+                'total_buildings': total_buildings,
                 'total_usage': round(total_usage, 2),
                 'total_cost': round(total_cost, 2),
                 'avg_usage_per_building': round(avg_usage_per_building, 2),
                 'fuel_breakdown': fuel_breakdown,
-                'buildings_by_category': self._group_by_category(buildings)
+                'buildings_by_category': buildings_by_category
             }
         }), 200
         
@@ -156,28 +210,19 @@ def get_dashboard_data():
         logger.error(f"Error fetching dashboard data: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
 
-def _group_by_category(buildings):
-    """Helper to group buildings by category"""
-    categories = {}
-    for building in buildings:
-        cat = building['category']
-        if cat not in categories:
-            categories[cat] = 0
-        categories[cat] += 1
-    return categories
-
 @energy_bp.route('/generate-data', methods=['POST'])
 def generate_energy_data():
     """Generate synthetic energy data for all buildings"""
     try:
         logger.info("Starting energy data generation...")
-        generator = EnergyDataGenerator()
+        generator = get_energy_generator()
         
         # Generate buildings and readings
         buildings = generator.generate_buildings()
         readings = generator.generate_readings_for_all_buildings()
         
         logger.info(f"Generated {len(buildings)} buildings and {len(readings)} readings")
+        cache.clear()
         
         return jsonify({
             'success': True,
@@ -193,17 +238,9 @@ def generate_energy_data():
 @energy_bp.route('/categories', methods=['GET'])
 def get_categories():
     """Get list of building categories"""
-    from config import Config
-    return jsonify({
-        'success': True,
-        'categories': Config.BUILDING_CATEGORIES
-    }), 200
+    return static_response(_CATEGORIES_BODY)
 
 @energy_bp.route('/fuel-types', methods=['GET'])
 def get_fuel_types():
     """Get list of fuel types"""
-    from config import Config
-    return jsonify({
-        'success': True,
-        'fuel_types': Config.FUEL_TYPES
-    }), 200
\ No newline at end of file
+    return static_response(_FUEL_TYPES_BODY)
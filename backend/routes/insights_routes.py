@@ -1,13 +1,108 @@
-from flask import Blueprint, request, jsonify
-from services.insights_engine import InsightsEngine
+from flask import Blueprint, Response, request, jsonify, stream_with_context
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+import hashlib
+import json
+import traceback
+import orjson
+import google.generativeai as genai
+from services.insights_engine import get_insights_engine
 from utils.supabase_client import SupabaseClient
+from utils.responses import ojsonify, static_json, static_response
+from utils.cache import cache, is_success, conditional_get
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 insights_bp = Blueprint('insights', __name__)
 db = SupabaseClient()
 
+# Runs the independent Supabase queries behind the suggestions prompt side by side
+_query_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='insights-query')
+
+# Built only from constants, so encode them once at import
+_PRIORITIES_BODY = static_json({'success': True, 'priorities': Config.INSIGHT_PRIORITIES})
+_CATEGORIES_BODY = static_json({'success': True, 'categories': Config.INSIGHT_CATEGORIES})
+
+# Gemini prompt for city-wide suggestions; only the data fields are filled in per request
+_SUGGESTIONS_PROMPT = """
+You are an expert smart city consultant providing ACTIONABLE SOLUTIONS for Boston's municipal infrastructure optimization from given data.
+
+ANALYSIS CONTEXT:
+You are analyzing real data from Boston's municipal infrastructure to provide specific, implementable solutions to real problems that city government can take action on immediately.
+
+CITY DATA SUMMARY:
+- Total Municipal Buildings: {total_buildings}
+- Total Energy Consumption: {total_energy_usage:,.2f} kWh
+- Total Energy Cost: ${total_energy_cost:,.2f}
+- Average Energy per Building: {avg_energy_per_building:,.2f} kWh
+- Energy Data Points Analyzed: {energy_points}
+- Traffic Data Points Analyzed: {traffic_points}
+
+TRAFFIC PATTERNS BY TIME PERIOD (readings per congestion level):
+{traffic_by_period}
+
+BUILDING PORTFOLIO:
+{building_portfolio}
+
+TASK:
+Generate 3-5 SPECIFIC ACTIONABLE SUGGESTIONS that Boston city government can implement to optimize energy consumption and traffic flow mentioning the identified problem. Each solution should be:
+
+1. A concrete action the city can take
+2. Mentioning specific buildings names as required, such as Central Library, City Hall, etc.
+3. Solving a problem based on the data patterns provided
+4. Realistic and implementable
+
+
+
+SOLUTION FORMAT REQUIREMENTS:
+Each solution must follow this exact structure:
+
+- "title": Answer with an Suggesting tone and describe WHAT TO DO, WHERE TO DO IT. Examples:
+  * "Install motion sensors at City Hall to reduce after-hours lighting costs"
+  * "Implement dynamic traffic signals at Mass Ave intersection during peak hours"
+  * "Upgrade HVAC systems in Community Center to reduce energy waste"
+
+- "why": Explain the problem statement - WHY this solution will help solve the problem, necessarily including data evidence
+
+EXAMPLE FORMAT:
+{{
+  "title": "Install programmable thermostats in Central Library to optimize heating schedules",
+  "why": "Building shows 40% higher energy usage during off-hours compared to similar facilities causing energy wastage and 20% cost increase",
+  "category": "Energy",
+  "priority": "high",
+  "estimated_impact": "15-20% reduction in heating costs",
+  "implementation_timeline": "Short-term",
+  "estimated_cost": "Low"
+}}
+
+CRITICAL INSTRUCTIONS:
+1. START each title with an Suggesting tone but mention clear actionable solution
+2. Be LOCATION-SPECIFIC (mention exact buildings, intersections, or areas)
+3. Focus on SOLUTIONS along with problems and the why behind them
+4. Base solutions on the actual data patterns provided
+5. Make solutions realistic and implementable by city government
+6. Order by priority: HIGH first, then MEDIUM, then LOW
+
+Return your response as a JSON array with this exact structure:
+[
+    {{
+        "title": "[ACTION VERB] [SPECIFIC SOLUTION] at [SPECIFIC LOCATION]",
+        "why": "Problem explanation based on data evidence",
+        "category": "Energy" or "Traffic" or "Cross-Sector",
+        "priority": "high" or "medium" or "low",
+        "estimated_impact": "Brief description of expected benefit",
+        "implementation_timeline": "Short-term" or "Medium-term" or "Long-term",
+        "estimated_cost": "Low" or "Medium" or "High" or "TBD"
+    }}
+]
+
+IMPORTANT: Return ONLY valid JSON, no markdown formatting. Focus on ACTIONABLE SOLUTIONS, not problem identification.
+"""
+
 @insights_bp.route('/', methods=['GET'])
+@conditional_get
+@cache.cached(query_string=True, response_filter=is_success)
 def get_insights():
     """Get all insights with optional filters"""
     try:
@@ -30,7 +125,7 @@ def get_insights():
         
         response = query.limit(limit).order('created_at', desc=True).execute()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'count': len(response.data),
             'insights': response.data
@@ -47,9 +142,13 @@ def get_insight(insight_id):
         response = db.get_client().table('insights')\
             .select('*')\
             .eq('id', insight_id)\
-            .single()\
+            .maybe_single()\
             .execute()
         
+        # maybe_single returns no response at all when the row doesn't exist
+        if response is None:
+            return jsonify({'success': False, 'error': f'Insight {insight_id} not found'}), 404
+        
         return jsonify({
             'success': True,
             'insight': response.data
@@ -57,9 +156,11 @@ def get_insight(insight_id):
         
     except Exception as e:
         logger.error(f"Error fetching insight {insight_id}: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 404
+        return jsonify({'success': False, 'error': str(e)}), 500
 
 @insights_bp.route('/building/<int:building_id>', methods=['GET'])
+@conditional_get
+@cache.cached(query_string=True, response_filter=is_success)
 def get_building_insights(building_id):
     """Get insights for specific building"""
     try:
@@ -67,11 +168,11 @@ def get_building_insights(building_id):
             .select('*')\
             .eq('entity_type', 'building')\
             .eq('entity_id', building_id)\
-            .order('priority')\
+            .order('priority_rank')\
             .order('created_at', desc=True)\
             .execute()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'count': len(response.data),
             'insights': response.data
@@ -102,29 +203,39 @@ def generate_insights():
         if not building_id and request.args.get('building_id'):
             building_id = int(request.args.get('building_id'))
         
-        engine = InsightsEngine()
+        engine = get_insights_engine()
         
         if building_id:
             # Generate insights for specific building
             insights = engine.generate_comprehensive_insights(building_id)
             message = f'Insights generated for building {building_id}'
         else:
-            # Generate insights for all buildings
-            buildings_response = db.get_client().table('energy_buildings')\
-                .select('id')\
-                .execute()
-            
-            all_insights = []
-            for building in buildings_response.data:
-                building_insights = engine.generate_comprehensive_insights(building['id'])
-                all_insights.extend(building_insights)
-            
-            insights = all_insights
+            # Generate insights for all buildings, a bounded batch of ids at a time
+            insights = []
+            batch_size = Config.INSIGHTS_BUILDING_BATCH_SIZE
+            offset = 0
+            while True:
+                buildings_response = db.get_client().table('energy_buildings')\
+                    .select('id')\
+                    .order('id')\
+                    .range(offset, offset + batch_size - 1)\
+                    .execute()
+                building_ids = [building['id'] for building in buildings_response.data]
+                
+                # Stop at the first empty page; an empty table needs no analysis at all
+                if not building_ids:
+                    break
+                insights.extend(engine.generate_insights_for_buildings(building_ids))
+                
+                if len(building_ids) < batch_size:
+                    break
+                offset += batch_size
             message = 'Insights generated for all buildings'
         
         logger.info(f"Generated {len(insights)} insights")
+        cache.clear()
         
-        return jsonify({
+        return ojsonify({
             'success': True,
             'message': message,
             'count': len(insights),
@@ -134,67 +245,31 @@ def generate_insights():
     except Exception as e:
         logger.error(f"Error generating insights: {str(e)}")
         return jsonify({'success': False, 'error': str(e)}), 500
-        
-    except Exception as e:
-        logger.error(f"Error generating insights: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
 
 @insights_bp.route('/priorities', methods=['GET'])
 def get_priorities():
     """Get list of insight priorities"""
-    from config import Config
-    return jsonify({
-        'success': True,
-        'priorities': Config.INSIGHT_PRIORITIES
-    }), 200
+    return static_response(_PRIORITIES_BODY)
 
 @insights_bp.route('/categories', methods=['GET'])
 def get_categories():
     """Get list of insight categories"""
-    from config import Config
-    return jsonify({
-        'success': True,
-        'categories': Config.INSIGHT_CATEGORIES
-    }), 200
+    return static_response(_CATEGORIES_BODY)
 
 @insights_bp.route('/summary', methods=['GET'])
+@cache.cached(response_filter=is_success)
 def get_insights_summary():
     """Get summary of insights by priority and type"""
     try:
-        response = db.get_client().table('insights').select('*').execute()
-        insights = response.data
+        # Counts and savings are aggregated in the database, so no insight rows are transferred
+        summary = db.get_client().rpc('insights_summary').execute().data
         
-        if not insights:
+        if not summary['total_insights']:
             return jsonify({
                 'success': True,
                 'message': 'No insights available'
             }), 200
         
-        # Group by priority
-        by_priority = {}
-        for insight in insights:
-            priority = insight['priority']
-            by_priority[priority] = by_priority.get(priority, 0) + 1
-        
-        # Group by type
-        by_type = {}
-        for insight in insights:
-            itype = insight['insight_type']
-            by_type[itype] = by_type.get(itype, 0) + 1
-        
-        # Calculate total potential savings
-        total_savings = sum(
-            insight.get('potential_savings', 0) or 0 
-            for insight in insights
-        )
-        
-        summary = {
-            'total_insights': len(insights),
-            'by_priority': by_priority,
-            'by_type': by_type,
-            'total_potential_savings': round(total_savings, 2)
-        }
-        
         return jsonify({
             'success': True,
             'summary': summary
@@ -208,138 +283,25 @@ def get_insights_summary():
 def generate_city_optimization_suggestions():
     """Generate city-wide optimization suggestions using Gemini API"""
     try:
-        import google.generativeai as genai
-        import os
-        import json
-        
-        # Configure Gemini API
-        from config import Config
-        api_key = Config.GEMINI_API_KEY
-        if not api_key:
+        if not Config.GEMINI_API_KEY:
             return jsonify({'success': False, 'error': 'GEMINI_API_KEY not configured'}), 500
         
         # Try to use Gemini API, fallback to mock data if it fails
         try:
-            genai.configure(api_key=api_key)
-            model = genai.GenerativeModel('gemini-2.5-flash')
+            model = _get_gemini_model()
             use_gemini = True
         except Exception as e:
             logger.warning(f"Gemini API not available, using mock data: {str(e)}")
             use_gemini = False
         
-        logger.info("Fetching city-wide data for optimization suggestions...")
-        
-        # Get all energy buildings data
-        buildings_response = db.get_client().table('energy_buildings').select('*').execute()
-        buildings = buildings_response.data if buildings_response.data else []
-        
-        # Get recent energy consumption data
-        energy_response = db.get_client().table('energy_readings')\
-            .select('*')\
-            .order('reading_date', desc=True)\
-            .limit(1000)\
-            .execute()
-        energy_data = energy_response.data if energy_response.data else []
-        
-        # Get recent traffic data
-        traffic_response = db.get_client().table('traffic_data')\
-            .select('*')\
-            .order('reading_timestamp', desc=True)\
-            .limit(1000)\
-            .execute()
-        traffic_data = traffic_response.data if traffic_response.data else []
-        
-        # Calculate city-wide statistics
-        total_buildings = len(buildings)
-        total_energy_usage = sum(r.get('usage', 0) for r in energy_data)
-        total_energy_cost = sum(r.get('cost', 0) for r in energy_data)
-        avg_energy_per_building = total_energy_usage / max(total_buildings, 1)
+        prompt, data_summary = _build_suggestions_prompt()
         
-        # Analyze traffic patterns
-        traffic_by_period = {}
-        for reading in traffic_data:
-            period = reading.get('time_period', 'unknown')
-            congestion = reading.get('congestion_level', 'unknown')
-            if period not in traffic_by_period:
-                traffic_by_period[period] = []
-            traffic_by_period[period].append(congestion)
-        
-        # Create detailed prompt for Gemini
-        # Create detailed prompt for Gemini
-        prompt = f"""
-You are an expert smart city consultant providing ACTIONABLE SOLUTIONS for Boston's municipal infrastructure optimization from given data.
-
-ANALYSIS CONTEXT:
-You are analyzing real data from Boston's municipal infrastructure to provide specific, implementable solutions to real problems that city government can take action on immediately.
-
-CITY DATA SUMMARY:
-- Total Municipal Buildings: {total_buildings}
-- Total Energy Consumption: {total_energy_usage:,.2f} kWh
-- Total Energy Cost: ${total_energy_cost:,.2f}
-- Average Energy per Building: {avg_energy_per_building:,.2f} kWh
-- Energy Data Points Analyzed: {len(energy_data)}
-- Traffic Data Points Analyzed: {len(traffic_data)}
-
-TRAFFIC PATTERNS BY TIME PERIOD:
-{json.dumps(traffic_by_period, indent=2)}
-
-BUILDING PORTFOLIO:
-{json.dumps([b.get('category', 'Unknown') for b in buildings[:10]], indent=2)}
-
-TASK:
-Generate 3-5 SPECIFIC ACTIONABLE SUGGESTIONS that Boston city government can implement to optimize energy consumption and traffic flow mentioning the identified problem. Each solution should be:
-
-1. A concrete action the city can take
-2. Mentioning specific buildings names as required, such as Central Library, City Hall, etc.
-3. Solving a problem based on the data patterns provided
-4. Realistic and implementable
-
-
-
-SOLUTION FORMAT REQUIREMENTS:
-Each solution must follow this exact structure:
-
-- "title": Answer with an Suggesting tone and describe WHAT TO DO, WHERE TO DO IT. Examples:
-  * "Install motion sensors at City Hall to reduce after-hours lighting costs"
-  * "Implement dynamic traffic signals at Mass Ave intersection during peak hours"
-  * "Upgrade HVAC systems in Community Center to reduce energy waste"
-
-- "why": Explain the problem statement - WHY this solution will help solve the problem, necessarily including data evidence
-
-EXAMPLE FORMAT:
-{{
-  "title": "Install programmable thermostats in Central Library to optimize heating schedules",
-  "why": "Building shows 40% higher energy usage during off-hours compared to similar facilities causing energy wastage and 20% cost increase",
-  "category": "Energy",
-  "priority": "high",
-  "estimated_impact": "15-20% reduction in heating costs",
-  "implementation_timeline": "Short-term",
-  "estimated_cost": "Low"
-}}
-
-CRITICAL INSTRUCTIONS:
-1. START each title with an Suggesting tone but mention clear actionable solution
-2. Be LOCATION-SPECIFIC (mention exact buildings, intersections, or areas)
-3. Focus on SOLUTIONS along with problems and the why behind them
-4. Base solutions on the actual data patterns provided
-5. Make solutions realistic and implementable by city government
-6. Order by priority: HIGH first, then MEDIUM, then LOW
-
-Return your response as a JSON array with this exact structure:
-[
-    {{
-        "title": "[ACTION VERB] [SPECIFIC SOLUTION] at [SPECIFIC LOCATION]",
-        "why": "Problem explanation based on data evidence",
-        "category": "Energy" or "Traffic" or "Cross-Sector",
-        "priority": "high" or "medium" or "low",
-        "estimated_impact": "Brief description of expected benefit",
-        "implementation_timeline": "Short-term" or "Medium-term" or "Long-term",
-        "estimated_cost": "Low" or "Medium" or "High" or "TBD"
-    }}
-]
-
-IMPORTANT: Return ONLY valid JSON, no markdown formatting. Focus on ACTIONABLE SOLUTIONS, not problem identification.
-"""
+        # The prompt is built only from the data, so an identical prompt can reuse the last answer
+        cache_key = f"suggestions:{hashlib.sha256(prompt.encode()).hexdigest()}"
+        suggestions = cache.get(cache_key)
+        if suggestions is not None:
+            logger.info("Reusing cached city optimization suggestions")
+            return jsonify(_suggestions_payload(suggestions, data_summary)), 200
         
         if use_gemini:
             # Call Gemini API
@@ -354,24 +316,14 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting. Focus on ACTIONABLE S
                     if text.startswith('```'):
                         text = text.replace('```json', '').replace('```', '').strip()
                     
-                    suggestions = json.loads(text)
+                    suggestions = orjson.loads(text)
                     
                     logger.info(f"Generated {len(suggestions)} city optimization suggestions via Gemini")
+                    cache.set(cache_key, suggestions, timeout=Config.SUGGESTIONS_CACHE_TTL)
                     
-                    return jsonify({
-                        'success': True,
-                        'message': f'Generated {len(suggestions)} AI-powered city optimization suggestions',
-                        'count': len(suggestions),
-                        'suggestions': suggestions,
-                        'data_summary': {
-                            'total_buildings': total_buildings,
-                            'total_energy_usage': total_energy_usage,
-                            'total_energy_cost': total_energy_cost,
-                            'data_points_analyzed': len(energy_data) + len(traffic_data)
-                        }
-                    }), 200
+                    return jsonify(_suggestions_payload(suggestions, data_summary)), 200
                     
-                except json.JSONDecodeError as e:
+                except orjson.JSONDecodeError as e:
                     logger.error(f"Failed to parse Gemini response: {str(e)}")
                     logger.error(f"Response was: {response.text[:500]}")
                     # Fall through to mock data
@@ -392,10 +344,152 @@ IMPORTANT: Return ONLY valid JSON, no markdown formatting. Focus on ACTIONABLE S
         
     except Exception as e:
         logger.error(f"Error generating city optimization suggestions: {str(e)}")
-        import traceback
         logger.error(f"Full traceback: {traceback.format_exc()}")
         return jsonify({
             'success': False, 
             'error': str(e),
             'message': 'An unexpected error occurred while generating suggestions'
-        }), 500
\ No newline at end of file
+        }), 500
+
+@insights_bp.route('/suggestions/stream', methods=['POST'])
+def stream_city_optimization_suggestions():
+    """Stream city-wide optimization suggestions as NDJSON while Gemini is still generating them"""
+    try:
+        if not Config.GEMINI_API_KEY:
+            return jsonify({'success': False, 'error': 'GEMINI_API_KEY not configured'}), 500
+        
+        model = _get_gemini_model()
+        prompt, data_summary = _build_suggestions_prompt()
+    except Exception as e:
+        logger.error(f"Error preparing city optimization suggestions: {str(e)}")
+        return jsonify({'success': False, 'error': str(e)}), 500
+    
+    cache_key = f"suggestions:{hashlib.sha256(prompt.encode()).hexdigest()}"
+    
+    def generate():
+        # One JSON document per line: the data summary, each suggestion as soon as
+        # Gemini has finished writing it, then a closing line with the count
+        yield orjson.dumps({'type': 'summary', 'data_summary': data_summary}) + b'\n'
+        
+        suggestions = cache.get(cache_key)
+        cached = suggestions is not None
+        if cached:
+            logger.info("Reusing cached city optimization suggestions")
+        else:
+            suggestions = []
+        
+        try:
+            source = suggestions if cached else _iter_json_array(
+                chunk.text for chunk in model.generate_content(prompt, stream=True)
+            )
+            for suggestion in source:
+                if not cached:
+                    suggestions.append(suggestion)
+                yield orjson.dumps({'type': 'suggestion', 'suggestion': suggestion}) + b'\n'
+        except Exception as e:
+            # Headers are already sent, so the failure is reported in-band
+            logger.error(f"Streaming Gemini suggestions failed: {str(e)}")
+            yield orjson.dumps({'type': 'error', 'error': str(e)}) + b'\n'
+            return
+        
+        if not cached:
+            logger.info(f"Streamed {len(suggestions)} city optimization suggestions via Gemini")
+            cache.set(cache_key, suggestions, timeout=Config.SUGGESTIONS_CACHE_TTL)
+        yield orjson.dumps({'type': 'done', 'count': len(suggestions)}) + b'\n'
+    
+    return Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+
+def _build_suggestions_prompt():
+    """Fetch city-wide data and build the Gemini prompt and the data summary sent alongside its suggestions"""
+    logger.info("Fetching city-wide data for optimization suggestions...")
+    
+    # Building categories, plus energy totals over the latest 1000 readings and
+    # congestion level counts per time period over the latest 1000 traffic readings
+    # aggregated in the database; the two queries are independent, so run them together
+    buildings_future = _query_pool.submit(
+        db.get_client().table('energy_buildings').select('category').execute
+    )
+    inputs_future = _query_pool.submit(
+        db.get_client().rpc('suggestion_inputs').execute
+    )
+    buildings = buildings_future.result().data or []
+    inputs = inputs_future.result().data
+    energy_points = inputs['energy_readings']
+    traffic_points = inputs['traffic_readings']
+    traffic_by_period = inputs['traffic_by_period']
+    
+    # Calculate city-wide statistics
+    total_buildings = len(buildings)
+    total_energy_usage = inputs['total_usage']
+    total_energy_cost = inputs['total_cost']
+    avg_energy_per_building = total_energy_usage / max(total_buildings, 1)
+    
+    # Compact JSON reads the same to Gemini and is cheaper to encode than indented
+    prompt = _SUGGESTIONS_PROMPT.format(
+        total_buildings=total_buildings,
+        total_energy_usage=total_energy_usage,
+        total_energy_cost=total_energy_cost,
+        avg_energy_per_building=avg_energy_per_building,
+        energy_points=energy_points,
+        traffic_points=traffic_points,
+        traffic_by_period=orjson.dumps(traffic_by_period).decode(),
+        building_portfolio=orjson.dumps([b.get('category', 'Unknown') for b in buildings[:10]]).decode()
+    )
+    
+    data_summary = {
+        'total_buildings': total_buildings,
+        'total_energy_usage': total_energy_usage,
+        'total_energy_cost': total_energy_cost,
+        'data_points_analyzed': energy_points + traffic_points
+    }
+    
+    return prompt, data_summary
+
+@lru_cache(maxsize=1)
+def _get_gemini_model():
+    """Configure Gemini and build the model once; a failed attempt is retried on the next call"""
+    genai.configure(api_key=Config.GEMINI_API_KEY)
+    return genai.GenerativeModel(Config.GEMINI_MODEL)
+
+def _suggestions_payload(suggestions, data_summary):
+    """Response body for a list of city optimization suggestions"""
+    return {
+        'success': True,
+        'message': f'Generated {len(suggestions)} AI-powered city optimization suggestions',
+        'count': len(suggestions),
+        'suggestions': suggestions,
+        'data_summary': data_summary
+    }
+
+def _iter_json_array(text_chunks):
+    """Yield each element of a JSON array as soon as it is complete in a stream of text chunks"""
+    decoder = json.JSONDecoder()
+    buffer = ''
+    pos = 0
+    started = False
+    for text in text_chunks:
+        buffer += text
+        if not started:
+            # Skip any markdown code fence before the array opens
+            start = buffer.find('[')
+            if start == -1:
+                continue
+            pos = start + 1
+            started = True
+        while True:
+            while pos < len(buffer) and buffer[pos] in ' \t\r\n,':
+                pos += 1
+            if pos == len(buffer):
+                break
+            if buffer[pos] == ']':
+                return
+            try:
+                element, pos = decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                # Element is still incomplete; wait for more text
+                break
+            yield element
+        buffer = buffer[pos:]
+        pos = 0
+    # Returning from inside the loop is the only clean end
+    raise ValueError('Gemini response did not contain a complete JSON array')
@@ -1,32 +1,40 @@
 from flask import Blueprint, jsonify, request
+from concurrent.futures import ThreadPoolExecutor
 from utils.supabase_client import SupabaseClient
 from utils.email_service import EmailService
-from datetime import datetime, timedelta
+from utils.cache import cache, conditional_get
+from utils.responses import ojsonify
+from config import Config
+from datetime import datetime
 import logging
 
 
 logger = logging.getLogger(__name__)
 sim_bp = Blueprint('sim', __name__)
+db = SupabaseClient()
+client = db.get_client()
 email_service = EmailService()
 
+# Sends alert emails and records them off the request thread
+_alert_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='poop-alert')
+
 @sim_bp.route('/weather', methods=['GET'])
+@conditional_get
 def get_weather_data():
     """
     GET /api/sim/weather
     Fetch all weather data from the Weather table for simulation
     """
     try:
-        db = SupabaseClient()
-        supabase = db.get_client()
-        
-        response = supabase.table('Weather').select('*').order('id', desc=False).execute()
+        # Postgres renders every row as one JSON array in a single round trip
+        rows = client.rpc('all_weather').execute().data
         
-        if response.data:
-            logger.info(f"Successfully fetched {len(response.data)} weather records for simulation")
-            return jsonify({
+        if rows:
+            logger.info(f"Successfully fetched {len(rows)} weather records for simulation")
+            return ojsonify({
                 'success': True,
-                'data': response.data
-            }), 200
+                'data': rows
+            })
         else:
             logger.warning('No weather data found')
             return jsonify({
@@ -48,12 +56,10 @@ def get_weather_by_id(weather_id):
     Fetch specific weather entry by id
     """
     try:
-        db = SupabaseClient()
-        supabase = db.get_client()
+        response = client.table('Weather').select('*').eq('id', weather_id).maybe_single().execute()
         
-        response = supabase.table('Weather').select('*').eq('id', weather_id).single().execute()
-        
-        if response.data:
+        # maybe_single returns no response at all when the row doesn't exist
+        if response is not None:
             logger.info(f"Successfully fetched weather record {weather_id}")
             return jsonify({
                 'success': True,
@@ -97,45 +103,42 @@ def trigger_poop_alert():
         tamagotchi_name = data.get('tamagotchi_name', 'Traffic Alert')
         custom_message = data.get('custom_message')
         
-        db = SupabaseClient()
-        supabase = db.get_client()
+        # Check if we should send email (rate limiting - once per hour). cache.add only
+        # sets a missing key (SET NX EX on Redis), so concurrent requests can't both
+        # claim the hour and rate-limited calls never reach the database
+        key = f"poop_alert:{user_id}"
+        should_send_email = cache.add(key, True, timeout=Config.POOP_ALERT_INTERVAL)
+        if should_send_email:
+            # The claim is lost when the cache is cleared or the process restarts,
+            # so confirm it against the audit log once per hour
+            email_check = client.table('poop_alerts').select('created_at').eq('user_id', user_id).order('created_at', desc=True).limit(1).execute()
+            if email_check.data:
+                last_alert_time = datetime.fromisoformat(email_check.data[0]['created_at'].replace('Z', '+00:00'))
+                time_since_last = datetime.now(last_alert_time.tzinfo) - last_alert_time
+                remaining = Config.POOP_ALERT_INTERVAL - time_since_last.total_seconds()
+                if remaining > 0:
+                    cache.set(key, True, timeout=int(remaining) + 1)
+                    should_send_email = False
         
-        # Check if we should send email (rate limiting - once per hour)
-        email_check = supabase.table('poop_alerts').select('*').eq('user_id', user_id).order('created_at', desc=True).limit(1).execute()
+        if not should_send_email:
+            logger.info(f"Skipping email for user {user_id} - already alerted within the last hour")
         
-        should_send_email = True
-        if email_check.data:
-            last_alert = email_check.data[0]
-            last_alert_time = datetime.fromisoformat(last_alert['created_at'].replace('Z', '+00:00'))
-            time_since_last = datetime.now(last_alert_time.tzinfo) - last_alert_time
-            
-            if time_since_last < timedelta(hours=1):
-                should_send_email = False
-                logger.info(f"Skipping email for user {user_id} - last alert was {time_since_last.total_seconds() / 60:.1f} minutes ago")
-        
-        email_sent = False
         if should_send_email:
-            # Send email
-            email_sent = email_service.send_poop_alert(
-                user_email=user_email,
-                user_name=user_name,
-                tamagotchi_name=tamagotchi_name,
-                custom_message=custom_message
+            # Delivery and the audit insert run in the background so the request
+            # doesn't wait on SendGrid
+            _alert_pool.submit(
+                _send_and_log_alert,
+                user_id, user_email, user_name, tamagotchi_name, custom_message
             )
-            
-            # Log the alert in database
-            supabase.table('poop_alerts').insert({
-                'user_id': user_id,
-                'email_sent': email_sent,
-                'created_at': datetime.now().isoformat()
-            }).execute()
-            
-            logger.info(f"Poop alert triggered for user {user_id}, email sent: {email_sent}")
+            logger.info(f"Poop alert queued for user {user_id}")
         
+        # Same contract as before the send moved to the background: 200 with
+        # email_sent, which is null while a queued email's outcome is unknown
         return jsonify({
             'success': True,
-            'email_sent': email_sent,
-            'message': 'Poop alert triggered' if email_sent else 'Alert logged but email not sent (rate limited)'
+            'queued': should_send_email,
+            'email_sent': None if should_send_email else False,
+            'message': 'Poop alert queued' if should_send_email else 'Alert logged but email not sent (rate limited)'
         }), 200
         
     except Exception as e:
@@ -152,10 +155,7 @@ def get_poop_alerts(user_id):
     Get poop alert history for a user
     """
     try:
-        db = SupabaseClient()
-        supabase = db.get_client()
-        
-        response = supabase.table('poop_alerts').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
+        response = client.table('poop_alerts').select('*').eq('user_id', user_id).order('created_at', desc=True).execute()
         
         return jsonify({
             'success': True,
@@ -167,4 +167,25 @@ def get_poop_alerts(user_id):
         return jsonify({
             'success': False,
             'error': str(e)
-        }), 500
\ No newline at end of file
+        }), 500
+
+def _send_and_log_alert(user_id, user_email, user_name, tamagotchi_name, custom_message):
+    """Send a poop alert email and record it in poop_alerts"""
+    try:
+        email_sent = email_service.send_poop_alert(
+            user_email=user_email,
+            user_name=user_name,
+            tamagotchi_name=tamagotchi_name,
+            custom_message=custom_message
+        )
+        
+        # Log the alert in database
+        client.table('poop_alerts').insert({
+            'user_id': user_id,
+            'email_sent': email_sent,
+            'created_at': datetime.now().isoformat()
+        }).execute()
+        
+        logger.info(f"Poop alert triggered for user {user_id}, email sent: {email_sent}")
+    except Exception as e:
+        logger.error(f"Error sending poop alert for user {user_id}: {str(e)}")
@@ -1,6 +1,9 @@
 from flask import Blueprint, request, jsonify
 from services.traffic_generator import TrafficDataGenerator
 from utils.supabase_client import SupabaseClient
+from utils.responses import stream_rows
+from utils.helpers import parse_int_arg, next_page_offset
+from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
@@ -50,12 +53,17 @@ def get_intersection(intersection_id):
 @traffic_bp.route('/data', methods=['GET'])
 def get_traffic_data():
     """Get traffic data with optional filters"""
+    try:
+        limit = parse_int_arg(request.args, 'limit', Config.READINGS_PAGE_SIZE, minimum=1, maximum=Config.MAX_READINGS_PAGE_SIZE)
+        offset = parse_int_arg(request.args, 'offset', 0)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     try:
         intersection_id = request.args.get('intersection_id')
         start_time = request.args.get('start_time')
         end_time = request.args.get('end_time')
         time_period = request.args.get('time_period')
-        limit = int(request.args.get('limit', 1000))
         
         query = db.get_client().table('traffic_data').select('*')
         
@@ -68,13 +76,17 @@ def get_traffic_data():
         if time_period:
             query = query.eq('time_period', time_period)
         
-        response = query.limit(limit).order('reading_timestamp').execute()
+        # id breaks ties between intersections at the same timestamp so pages never overlap
+        response = query.order('reading_timestamp')\
+            .order('id')\
+            .range(offset, offset + limit - 1)\
+            .execute()
         
-        return jsonify({
-            'success': True,
-            'count': len(response.data),
-            'data': response.data
-        }), 200
+        return stream_rows(
+            'data', response.data,
+            count=len(response.data),
+            next_offset=next_page_offset(offset, len(response.data), limit)
+        )
         
     except Exception as e:
         logger.error(f"Error fetching traffic data: {str(e)}")
@@ -119,6 +131,12 @@ def get_directional_data():
 @traffic_bp.route('/intersections/<int:intersection_id>/data', methods=['GET'])
 def get_intersection_data(intersection_id):
     """Get traffic data for specific intersection"""
+    try:
+        limit = parse_int_arg(request.args, 'limit', Config.READINGS_PAGE_SIZE, minimum=1, maximum=Config.MAX_READINGS_PAGE_SIZE)
+        offset = parse_int_arg(request.args, 'offset', 0)
+    except ValueError as e:
+        return jsonify({'success': False, 'error': str(e)}), 400
+    
     try:
         start_time = request.args.get('start_time')
         end_time = request.args.get('end_time')
@@ -132,13 +150,16 @@ def get_intersection_data(intersection_id):
         if end_time:
             query = query.lte('reading_timestamp', end_time)
         
-        response = query.order('reading_timestamp').execute()
+        response = query.order('reading_timestamp')\
+            .order('id')\
+            .range(offset, offset + limit - 1)\
+            .execute()
         
-        return jsonify({
-            'success': True,
-            'count': len(response.data),
-            'data': response.data
-        }), 200
+        return stream_rows(
+            'data', response.data,
+            count=len(response.data),
+            next_offset=next_page_offset(offset, len(response.data), limit)
+        )
         
     except Exception as e:
         logger.error(f"Error fetching data for intersection {intersection_id}: {str(e)}")
@@ -171,42 +192,22 @@ def generate_traffic_data():
 def get_traffic_summary():
     """Get traffic summary statistics"""
     try:
-        start_time = request.args.get('start_time')
-        end_time = request.args.get('end_time')
+        # Empty values mean no bound, as before
+        start_time = request.args.get('start_time') or None
+        end_time = request.args.get('end_time') or None
         
-        query = db.get_client().table('traffic_data').select('*')
+        # Totals, average speed and congestion counts are aggregated in the database
+        summary = db.get_client().rpc('traffic_summary', {
+            'p_start': start_time,
+            'p_end': end_time
+        }).execute().data
         
-        if start_time:
-            query = query.gte('reading_timestamp', start_time)
-        if end_time:
-            query = query.lte('reading_timestamp', end_time)
-        
-        response = query.execute()
-        data = response.data
-        
-        if not data:
+        if not summary['records_count']:
             return jsonify({
                 'success': True,
                 'message': 'No traffic data available'
             }), 200
         
-        # Calculate summary statistics
-        total_vehicles = sum(d['total_vehicle_count'] for d in data)
-        avg_speed = sum(d['average_speed'] for d in data) / len(data)
-        
-        # Count by congestion level
-        congestion_counts = {}
-        for d in data:
-            level = d['congestion_level']
-            congestion_counts[level] = congestion_counts.get(level, 0) + 1
-        
-        summary = {
-            'total_vehicle_count': total_vehicles,
-            'average_speed': round(avg_speed, 2),
-            'congestion_distribution': congestion_counts,
-            'records_count': len(data)
-        }
-        
         return jsonify({
             'success': True,
             'summary': summary
@@ -219,7 +220,6 @@ def get_traffic_summary():
 @traffic_bp.route('/time-periods', methods=['GET'])
 def get_time_periods():
     """Get list of time periods"""
-    from config import Config
     return jsonify({
         'success': True,
         'time_periods': Config.TRAFFIC_TIME_PERIODS
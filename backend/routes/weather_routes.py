@@ -1,7 +1,10 @@
 from flask import Blueprint, request, jsonify
 from services.weather_generator import WeatherDataGenerator
 from utils.supabase_client import SupabaseClient
+from cachetools import TTLCache, cached
+from config import Config
 import httpx
+import threading
 from datetime import datetime
 import pytz
 import logging
@@ -14,6 +17,37 @@ db = SupabaseClient()
 LAT = 42.3601
 LON = -71.0589
 
+OPENMETEO_CURRENT_URL = (
+    f"https://api.open-meteo.com/v1/forecast"
+    f"?latitude={LAT}&longitude={LON}"
+    f"&current=is_day,cloudcover,shortwave_radiation,temperature_2m,precipitation,rain"
+    f"&hourly=precipitation_probability"
+    f"&forecast_days=1"
+)
+OPENMETEO_FORECAST_URL = (
+    f"https://api.open-meteo.com/v1/forecast"
+    f"?latitude={LAT}&longitude={LON}"
+    f"&hourly=is_day,cloudcover,shortwave_radiation,temperature_2m,precipitation_probability,rain"
+    f"&forecast_days=1"
+)
+
+# Shared by every OpenMeteo request so keep-alive connections are reused
+_openmeteo_http = httpx.Client(
+    timeout=Config.OPENMETEO_TIMEOUT,
+    limits=httpx.Limits(max_keepalive_connections=10),
+    http2=True
+)
+
+# Response field for each OpenMeteo hourly forecast variable
+FORECAST_FIELDS = {
+    'is_day': 'is_day',
+    'cloudcover': 'cloudcover_percent',
+    'shortwave_radiation': 'shortwave_radiation_wm2',
+    'temperature_2m': 'temperature_c',
+    'precipitation_probability': 'precip_prob_percent',
+    'rain': 'rain_mm',
+}
+
 
 @weather_bp.route('/openmeteo_current', methods=['GET'])
 def get_current_weather_openmeteo():
@@ -27,19 +61,7 @@ def get_current_weather_openmeteo():
     - rain
     """
     try:
-        url = (
-            f"https://api.open-meteo.com/v1/forecast"
-            f"?latitude={LAT}&longitude={LON}"
-            f"&current=is_day,cloudcover,shortwave_radiation,temperature_2m,precipitation,rain"
-            f"&hourly=precipitation_probability"
-            f"&forecast_days=1"
-        )
-        
-        with httpx.Client() as client:
-            r = client.get(url)
-            if r.status_code != 200:
-                raise Exception(f"OpenMeteo API error: {r.status_code}")
-            data = r.json()
+        data = _fetch_current_openmeteo()
 
         current = data.get("current", {})
         
@@ -82,33 +104,17 @@ def get_forecast_openmeteo():
     - rain
     """
     try:
-        url = (
-            f"https://api.open-meteo.com/v1/forecast"
-            f"?latitude={LAT}&longitude={LON}"
-            f"&hourly=is_day,cloudcover,shortwave_radiation,temperature_2m,precipitation_probability,rain"
-            f"&forecast_days=1"
-        )
-
-        with httpx.Client() as client:
-            r = client.get(url)
-            if r.status_code != 200:
-                raise Exception(f"OpenMeteo API error: {r.status_code}")
-            data = r.json()
+        data = _fetch_forecast_openmeteo()
 
         h = data.get("hourly", {})
         times = h.get("time", [])
 
-        results = []
-        for i, t in enumerate(times):
-            results.append({
-                "timestamp": t,
-                "is_day": h.get("is_day", [None])[i] if i < len(h.get("is_day", [])) else None,
-                "cloudcover_percent": h.get("cloudcover", [None])[i] if i < len(h.get("cloudcover", [])) else None,
-                "shortwave_radiation_wm2": h.get("shortwave_radiation", [None])[i] if i < len(h.get("shortwave_radiation", [])) else None,
-                "temperature_c": h.get("temperature_2m", [None])[i] if i < len(h.get("temperature_2m", [])) else None,
-                "precip_prob_percent": h.get("precipitation_probability", [None])[i] if i < len(h.get("precipitation_probability", [])) else None,
-                "rain_mm": h.get("rain", [None])[i] if i < len(h.get("rain", [])) else None,
-            })
+        # Columns OpenMeteo leaves short or omits are padded with None, then
+        # each hour is built from one row across all of them
+        columns = [h.get(key) or [] for key in FORECAST_FIELDS]
+        columns = [column + [None] * (len(times) - len(column)) for column in columns]
+        fields = ('timestamp', *FORECAST_FIELDS.values())
+        results = [dict(zip(fields, row)) for row in zip(times, *columns)]
 
         return jsonify({
             'success': True,
@@ -118,4 +124,24 @@ def get_forecast_openmeteo():
         
     except Exception as e:
         logger.error(f"Error fetching forecast from OpenMeteo: {str(e)}")
-        return jsonify({'success': False, 'error': str(e)}), 500
\ No newline at end of file
+        return jsonify({'success': False, 'error': str(e)}), 500
+
+
+def _fetch_openmeteo(url):
+    """GET an OpenMeteo URL and return its JSON payload"""
+    r = _openmeteo_http.get(url)
+    if r.status_code != 200:
+        raise Exception(f"OpenMeteo API error: {r.status_code}")
+    return r.json()
+
+# OpenMeteo payloads are reused for a few minutes; concurrent misses wait on the
+# request already in flight instead of sending their own. Errors are not cached
+@cached(TTLCache(maxsize=1, ttl=Config.OPENMETEO_CURRENT_TTL), condition=threading.Condition())
+def _fetch_current_openmeteo():
+    """Current conditions payload for Boston"""
+    return _fetch_openmeteo(OPENMETEO_CURRENT_URL)
+
+@cached(TTLCache(maxsize=1, ttl=Config.OPENMETEO_FORECAST_TTL), condition=threading.Condition())
+def _fetch_forecast_openmeteo():
+    """Hourly forecast payload for Boston"""
+    return _fetch_openmeteo(OPENMETEO_FORECAST_URL)
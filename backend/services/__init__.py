@@ -2,10 +2,10 @@
 Business logic services for Boston Energy Insights
 """
 
-from .energy_generator import EnergyDataGenerator
+from .energy_generator import EnergyDataGenerator, get_energy_generator
 from .weather_generator import WeatherDataGenerator
 from .traffic_generator import TrafficDataGenerator
-from .insights_engine import InsightsEngine
+from .insights_engine import InsightsEngine, get_insights_engine
 from .weather_normalizer import WeatherNormalizer
 from .correlation_analyzer import CorrelationAnalyzer
 
@@ -15,5 +15,7 @@ __all__ = [
     'TrafficDataGenerator',
     'InsightsEngine',
     'WeatherNormalizer',
-    'CorrelationAnalyzer'
+    'CorrelationAnalyzer',
+    'get_energy_generator',
+    'get_insights_engine'
 ]
\ No newline at end of file
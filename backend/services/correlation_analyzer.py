@@ -21,7 +21,7 @@ class CorrelationAnalyzer:
             
             # Get building location
             building_response = self.db.table('energy_buildings')\
-                .select('*')\
+                .select('latitude, longitude')\
                 .eq('id', building_id)\
                 .single()\
                 .execute()
@@ -33,7 +33,7 @@ class CorrelationAnalyzer:
             
             # Find nearby intersections (within 0.5 mile)
             intersections_response = self.db.table('traffic_intersections')\
-                .select('*')\
+                .select('id, latitude, longitude')\
                 .execute()
             
             nearby_intersections = []
@@ -126,7 +126,7 @@ class CorrelationAnalyzer:
             
             # Get energy data
             energy_response = self.db.table('energy_readings')\
-                .select('*')\
+                .select('reading_date, usage')\
                 .eq('building_id', building_id)\
                 .execute()
             
@@ -135,7 +135,7 @@ class CorrelationAnalyzer:
             
             # Get weather data
             weather_response = self.db.table('weather_data')\
-                .select('*')\
+                .select('reading_date, temp_avg, heating_degree_days, cooling_degree_days')\
                 .execute()
             
             if not weather_response.data:
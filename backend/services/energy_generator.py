@@ -1,10 +1,11 @@
-import random
+import numpy as np
+from functools import lru_cache
 from datetime import datetime, timedelta
 from typing import List, Dict
 from config import Config
-from models.energy import EnergyBuilding, EnergyReading
+from models.energy import EnergyBuilding
 from utils.supabase_client import SupabaseClient
-from utils.helpers import generate_random_coords, generate_date_range
+from utils.helpers import generate_date_range, chunked
 import logging
 
 logger = logging.getLogger(__name__)
@@ -12,6 +13,17 @@ logger = logging.getLogger(__name__)
 class EnergyDataGenerator:
     """Generate synthetic energy data for buildings"""
     
+    # Usage multiplier indexed by month - 1: heating in winter, cooling in summer
+    SEASONAL_FACTORS = np.array([1.3, 1.3, 1.0, 1.0, 1.0, 1.2, 1.2, 1.2, 1.0, 1.0, 1.0, 1.3])
+    
+    # Share of base consumption drawn from each fuel type
+    FUEL_FACTORS = {
+        'electricity': 1.0,
+        'natural_gas': 0.6,
+        'oil': 0.3,
+        'propane': 0.2
+    }
+    
     def __init__(self):
         self.db = SupabaseClient().get_client()
         self.config = Config
@@ -30,26 +42,46 @@ class EnergyDataGenerator:
         
         buildings = []
         
-        for i in range(self.config.NUM_BUILDINGS):
-            lat, lng = generate_random_coords(self.config.BOSTON_BOUNDS)
-            
-            building = EnergyBuilding(
-                name=building_names[i % len(building_names)] + f" #{i+1}" if i >= len(building_names) else building_names[i],
-                address=f"{random.randint(1, 999)} {random.choice(['Main', 'Oak', 'Elm', 'Maple', 'Washington'])} St",
+        n = self.config.NUM_BUILDINGS
+        names = [
+            building_names[i % len(building_names)] + f" #{i+1}" if i >= len(building_names) else building_names[i]
+            for i in range(n)
+        ]
+        
+        # Draw every random attribute for all buildings up front, from a generator of
+        # this call's own: Generators are not thread-safe and requests run concurrently
+        rng = np.random.default_rng(self.config.DATA_RANDOM_SEED)
+        bounds = self.config.BOSTON_BOUNDS
+        street_names = ['Main', 'Oak', 'Elm', 'Maple', 'Washington']
+        latitudes = rng.uniform(bounds['lat_min'], bounds['lat_max'], size=n).round(6).tolist()
+        longitudes = rng.uniform(bounds['lng_min'], bounds['lng_max'], size=n).round(6).tolist()
+        street_numbers = rng.integers(1, 1000, size=n).tolist()
+        streets = rng.integers(0, len(street_names), size=n).tolist()
+        square_feet = rng.integers(5000, 100001, size=n).tolist()
+        categories = rng.integers(0, len(self.config.BUILDING_CATEGORIES), size=n).tolist()
+        years_built = rng.integers(1950, 2021, size=n).tolist()
+        
+        building_dicts = [
+            EnergyBuilding(
+                name=names[i],
+                address=f"{street_numbers[i]} {street_names[streets[i]]} St",
                 city="Boston",
-                latitude=lat,
-                longitude=lng,
-                square_feet=random.randint(5000, 100000),
-                category=random.choice(self.config.BUILDING_CATEGORIES),
-                year_built=random.randint(1950, 2020)
-            )
-            
-            # Insert into database
-            response = self.db.table('energy_buildings').insert(building.to_dict()).execute()
-            building_data = response.data[0]
-            buildings.append(building_data)
-            
-            logger.info(f"Created building: {building.name} (ID: {building_data['id']})")
+                latitude=latitudes[i],
+                longitude=longitudes[i],
+                square_feet=square_feet[i],
+                category=self.config.BUILDING_CATEGORIES[categories[i]],
+                year_built=years_built[i]
+            ).to_dict()
+            for i in range(n)
+        ]
+        
+        # Insert into database in one request; rows come back in input order with their ids
+        for batch in chunked(building_dicts, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('energy_buildings').insert(batch).execute()
+            buildings.extend(response.data)
+        
+        for building_data in buildings:
+            logger.info(f"Created building: {building_data['name']} (ID: {building_data['id']})")
         
         return buildings
     
@@ -58,73 +90,93 @@ class EnergyDataGenerator:
         logger.info("Generating energy readings for all buildings...")
         
         # Get all buildings
-        buildings_response = self.db.table('energy_buildings').select('*').execute()
+        buildings_response = self.db.table('energy_buildings').select('id, name, square_feet').execute()
         buildings = buildings_response.data
         
-        all_readings = []
+        # The calendar and fuel mix are shared by every building, so build them once
+        date_strings, profile, unit_costs = self._build_reading_profile()
+        rng = np.random.default_rng(self.config.DATA_RANDOM_SEED)
         
+        rows = []
         for building in buildings:
-            readings = self._generate_readings_for_building(building)
-            all_readings.extend(readings)
+            rows.extend(self._generate_readings_for_building(building, date_strings, profile, unit_costs, rng))
+        
+        # Insert in bulk rather than one request per reading
+        all_readings = []
+        for batch in chunked(rows, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('energy_readings').insert(batch).execute()
+            all_readings.extend(response.data)
         
         logger.info(f"Generated {len(all_readings)} total energy readings")
         return all_readings
     
-    def _generate_readings_for_building(self, building: Dict) -> List[Dict]:
-        """Generate energy readings for a single building"""
-        readings = []
-        
+    def _build_reading_profile(self) -> tuple:
+        """Return (date strings, month x fuel usage factors, unit costs) for the reading window"""
         # Generate monthly readings for the past 24 months
         dates = generate_date_range(
             self.config.DATA_START_DATE,
             self.config.DATA_END_DATE,
             freq='M'
-        )
+        )[:self.config.NUM_MONTHS]
+        
+        fuel_types = self.config.FUEL_TYPES
+        months = np.fromiter((date.month for date in dates), dtype=np.int64, count=len(dates))
+        fuel_factors = np.array([self.FUEL_FACTORS.get(fuel_type, 0.5) for fuel_type in fuel_types])
+        unit_costs = np.array([self.config.ENERGY_COSTS[fuel_type] for fuel_type in fuel_types])
+        
+        # One row per month, one column per fuel type
+        profile = np.outer(self.SEASONAL_FACTORS[months - 1], fuel_factors)
+        date_strings = [date.strftime('%Y-%m-%d') for date in dates]
+        
+        return date_strings, profile, unit_costs
+    
+    def _generate_readings_for_building(
+        self,
+        building: Dict,
+        date_strings: List[str],
+        profile: np.ndarray,
+        unit_costs: np.ndarray,
+        rng: np.random.Generator
+    ) -> List[Dict]:
+        """Generate energy reading rows for a single building, ready for insertion"""
+        if not date_strings:
+            return []
+        
+        fuel_types = self.config.FUEL_TYPES
         
         # Base consumption based on building size
         base_consumption = building['square_feet'] * 0.5  # kWh per sq ft per month
         
-        for date in dates[:self.config.NUM_MONTHS]:
-            # Add seasonal variation
-            month = date.month
-            seasonal_factor = 1.0
-            
-            # Higher usage in summer (cooling) and winter (heating)
-            if month in [12, 1, 2]:  # Winter
-                seasonal_factor = 1.3
-            elif month in [6, 7, 8]:  # Summer
-                seasonal_factor = 1.2
-            
-            # Generate readings for each fuel type
-            for fuel_type in self.config.FUEL_TYPES:
-                # Not all buildings use all fuel types
-                if random.random() < 0.7:  # 70% chance to use this fuel type
-                    
-                    fuel_factor = {
-                        'electricity': 1.0,
-                        'natural_gas': 0.6,
-                        'oil': 0.3,
-                        'propane': 0.2
-                    }.get(fuel_type, 0.5)
-                    
-                    usage = base_consumption * fuel_factor * seasonal_factor
-                    usage += random.uniform(-usage * 0.1, usage * 0.1)  # Add noise
-                    usage = max(0, usage)  # Ensure non-negative
-                    
-                    # Calculate cost
-                    cost = usage * self.config.ENERGY_COSTS[fuel_type]
-                    
-                    reading = EnergyReading(
-                        building_id=building['id'],
-                        reading_date=date.strftime('%Y-%m-%d'),
-                        fuel_type=fuel_type,
-                        usage=round(usage, 2),
-                        cost=round(cost, 2)
-                    )
-                    
-                    # Insert into database
-                    response = self.db.table('energy_readings').insert(reading.to_dict()).execute()
-                    readings.append(response.data[0])
+        usage = base_consumption * profile
+        usage *= 1 + rng.uniform(-0.1, 0.1, size=usage.shape)  # Add noise
+        np.maximum(usage, 0, out=usage)  # Ensure non-negative
+        cost = usage * unit_costs
+        
+        # Not all buildings use all fuel types (70% chance per month and fuel)
+        uses_fuel = rng.random(usage.shape) < 0.7
+        
+        usage = usage.round(2).tolist()
+        cost = cost.round(2).tolist()
+        rows, cols = np.nonzero(uses_fuel)
+        
+        # Emit insert-ready rows directly (same shape as EnergyReading.to_dict)
+        # rather than building a model object per reading
+        building_id = building['id']
+        readings = [
+            {
+                'building_id': building_id,
+                'reading_date': date_strings[i],
+                'fuel_type': fuel_types[j],
+                'usage': usage[i][j],
+                'cost': cost[i][j]
+            }
+            for i, j in zip(rows.tolist(), cols.tolist())
+        ]
         
         logger.info(f"Generated {len(readings)} readings for building {building['name']}")
-        return readings
\ No newline at end of file
+        return readings
+
+@lru_cache(maxsize=1)
+def get_energy_generator() -> EnergyDataGenerator:
+    """Return the process-wide EnergyDataGenerator, constructing it on first use"""
+    return EnergyDataGenerator()
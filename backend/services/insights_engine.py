@@ -1,94 +1,212 @@
-from typing import List, Dict
+from typing import List, Dict, Optional
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
 import numpy as np
 from datetime import datetime, timedelta
 from models.insights import Insight
+from models.energy import ReadingBatch
 from services.weather_normalizer import WeatherNormalizer
 from services.correlation_analyzer import CorrelationAnalyzer
 from utils.supabase_client import SupabaseClient
+from utils.helpers import detect_zscore_anomalies, chunked
 from config import Config
 import logging
 
 logger = logging.getLogger(__name__)
 
+# Overlaps the building lookup with its readings fetch
+_fetch_pool = ThreadPoolExecutor(max_workers=2 * Config.INSIGHTS_MAX_CONCURRENCY, thread_name_prefix='insights-fetch')
+
+# Analyzes buildings side by side; their weather and traffic queries are I/O bound
+_analysis_pool = ThreadPoolExecutor(max_workers=Config.INSIGHTS_MAX_CONCURRENCY, thread_name_prefix='insights-analyze')
+
 class InsightsEngine:
     """Generate cross-domain AI insights"""
     
+    # Insight text templates, filled in with str.format
+    EFFICIENCY_TITLE = "High Energy Intensity at {name}"
+    EFFICIENCY_DESCRIPTION = (
+        "This building uses {intensity:.1f} kBTU/sf/year, "
+        "significantly above the benchmark of 100 kBTU/sf/year. "
+        "Consider energy efficiency upgrades such as LED lighting, "
+        "HVAC optimization, or building envelope improvements."
+    )
+    WEATHER_DESCRIPTION = (
+        "Weather accounts for {impact:.1f}% of energy variance "
+        "at {name}. Consider insulation upgrades, "
+        "weather stripping, or window replacements to reduce "
+        "weather sensitivity and improve energy efficiency."
+    )
+    TRAFFIC_DESCRIPTION = (
+        "Strong correlation (r={correlation:.2f}) detected between "
+        "nearby traffic patterns and energy usage at {name}. "
+        "This suggests occupancy-driven consumption. Consider implementing "
+        "smart HVAC scheduling or occupancy sensors to optimize energy use "
+        "based on actual building occupancy patterns."
+    )
+    ANOMALY_TITLE = "Unusual Energy {anomaly_type} Detected"
+    ANOMALY_DESCRIPTION = (
+        "Energy usage in {date} was {usage:.0f} kWh, "
+        "which is {z_score:.1f} standard deviations from "
+        "the average. Investigate potential equipment issues, "
+        "operational changes, or data collection problems."
+    )
+    COST_DESCRIPTION = (
+        "Average monthly energy cost of ${monthly_cost:,.2f} "
+        "at {name} presents opportunity for savings. "
+        "Implementing energy management strategies could reduce costs "
+        "by approximately ${monthly_savings:,.2f}/month."
+    )
+    
     def __init__(self):
         self.db = SupabaseClient().get_client()
         self.weather_normalizer = WeatherNormalizer()
         self.correlation_analyzer = CorrelationAnalyzer()
         self.config = Config
     
-    def generate_comprehensive_insights(self, building_id: int) -> List[Dict]:
-        """Generate all types of insights for a building"""
+    def generate_comprehensive_insights(self, building_id: int, as_of: Optional[datetime] = None) -> List[Dict]:
+        """Generate all types of insights for a building, analyzing the year up to as_of"""
+        as_of = as_of or datetime.now()
         logger.info(f"Generating comprehensive insights for building {building_id}")
         
-        insights = []
-        
         try:
-            # Get building info
-            building_response = self.db.table('energy_buildings')\
-                .select('*')\
-                .eq('id', building_id)\
-                .single()\
-                .execute()
+            # Get building info and, concurrently, the readings that feed the
+            # efficiency, anomaly and cost checks
+            building_future = _fetch_pool.submit(
+                self.db.table('energy_buildings')\
+                    .select('id, name, square_feet')\
+                    .eq('id', building_id)\
+                    .single()\
+                    .execute
+            )
+            readings_future = _fetch_pool.submit(self._get_readings_by_building, [building_id])
+            building_response = building_future.result()
+            readings = readings_future.result().get(building_id, [])
             
             if not building_response.data:
                 logger.warning(f"Building {building_id} not found")
-                return insights
-            
-            building = building_response.data
+                return []
             
-            # 1. Energy Efficiency Insights
-            insights.extend(self._generate_efficiency_insights(building))
-            
-            # 2. Weather-Normalized Insights
-            insights.extend(self._generate_weather_insights(building))
-            
-            # 3. Traffic Correlation Insights
-            insights.extend(self._generate_traffic_insights(building))
-            
-            # 4. Anomaly Detection Insights
-            insights.extend(self._generate_anomaly_insights(building))
-            
-            # 5. Cost Savings Opportunities
-            insights.extend(self._generate_cost_insights(building))
-            
-            # Save all insights to database
-            for insight in insights:
-                try:
-                    self.db.table('insights').insert(insight).execute()
-                except Exception as e:
-                    logger.error(f"Error saving insight: {str(e)}")
-            
-            logger.info(f"Generated {len(insights)} insights for building {building_id}")
+            insights = self._analyze_building(building_response.data, readings, as_of)
+            self._save_insights(insights)
             return insights
             
         except Exception as e:
             logger.error(f"Error generating insights: {str(e)}")
-            return insights
+            return []
     
-    def _generate_efficiency_insights(self, building: Dict) -> List[Dict]:
-        """Generate insights based on energy efficiency"""
+    def generate_insights_for_buildings(self, building_ids: List[int]) -> List[Dict]:
+        """Generate comprehensive insights for many buildings concurrently and save them together"""
+        if not building_ids:
+            return []
+        
+        # One query per table for every building in the batch instead of one per building
+        buildings_future = _fetch_pool.submit(
+            self.db.table('energy_buildings')\
+                .select('id, name, square_feet')\
+                .in_('id', building_ids)\
+                .execute
+        )
+        readings_future = _fetch_pool.submit(self._get_readings_by_building, building_ids)
+        buildings = buildings_future.result().data
+        readings_by_building = readings_future.result()
+        
+        # Every building in the batch is analyzed over the same window
+        as_of = datetime.now()
+        results = self._analyze_buildings(buildings, readings_by_building, as_of)
+        
+        insights = [insight for building_insights in results for insight in building_insights]
+        self._save_insights(insights)
+        
+        logger.info(f"Generated {len(insights)} insights for {len(results)} buildings")
+        return insights
+    
+    def _analyze_buildings(
+        self,
+        buildings: List[Dict],
+        readings_by_building: Dict[int, List[Dict]],
+        as_of: datetime
+    ) -> List[List[Dict]]:
+        """Analyze buildings on the shared analysis pool, INSIGHTS_MAX_CONCURRENCY at a time"""
+        def analyze(building: Dict) -> List[Dict]:
+            try:
+                readings = readings_by_building.get(building['id'], [])
+                return self._analyze_building(building, readings, as_of)
+            except Exception as e:
+                logger.error(f"Error generating insights for building {building['id']}: {str(e)}")
+                return []
+        
+        return list(_analysis_pool.map(analyze, buildings))
+    
+    def _analyze_building(self, building: Dict, readings: List[Dict], as_of: datetime) -> List[Dict]:
+        """Run every insight check for one building"""
+        # The 12 most recent readings feed both the efficiency and cost checks
+        recent = ReadingBatch.from_dicts(readings[:-13:-1])
+        
         insights = []
         
-        try:
-            # Get recent energy readings
+        # 1. Energy Efficiency Insights
+        insights.extend(self._generate_efficiency_insights(building, recent))
+        
+        # 2. Weather-Normalized Insights
+        insights.extend(self._generate_weather_insights(building, as_of))
+        
+        # 3. Traffic Correlation Insights
+        insights.extend(self._generate_traffic_insights(building))
+        
+        # 4. Anomaly Detection Insights
+        insights.extend(self._generate_anomaly_insights(building, readings))
+        
+        # 5. Cost Savings Opportunities
+        insights.extend(self._generate_cost_insights(building, recent))
+        
+        logger.info(f"Generated {len(insights)} insights for building {building['id']}")
+        return insights
+    
+    def _save_insights(self, insights: List[Dict]) -> None:
+        """Save insights to database in bulk"""
+        for batch in chunked(insights, self.config.DB_INSERT_BATCH_SIZE):
+            try:
+                self.db.table('insights').insert(batch).execute()
+            except Exception as e:
+                logger.error(f"Error saving insights: {str(e)}")
+    
+    def _get_readings_by_building(self, building_ids: List[int]) -> Dict[int, List[Dict]]:
+        """Fetch every energy reading of the given buildings, grouped by building in date order"""
+        readings_by_building = defaultdict(list)
+        page_size = self.config.READINGS_PAGE_SIZE
+        offset = 0
+        
+        # Page through the rows, since PostgREST caps how many one response may carry
+        while True:
             energy_response = self.db.table('energy_readings')\
-                .select('*')\
-                .eq('building_id', building['id'])\
-                .order('reading_date', desc=True)\
-                .limit(12)\
+                .select('building_id, reading_date, usage, cost')\
+                .in_('building_id', building_ids)\
+                .order('building_id')\
+                .order('reading_date')\
+                .order('id')\
+                .range(offset, offset + page_size - 1)\
                 .execute()
             
-            if not energy_response.data:
-                return insights
+            page = energy_response.data or []
+            for reading in page:
+                readings_by_building[reading['building_id']].append(reading)
             
-            readings = energy_response.data
+            if len(page) < page_size:
+                return readings_by_building
+            offset += page_size
+    
+    def _generate_efficiency_insights(self, building: Dict, recent: ReadingBatch) -> List[Dict]:
+        """Generate insights based on energy efficiency"""
+        insights = []
+        
+        try:
+            if not len(recent):
+                return insights
             
             # Calculate energy intensity (kBTU/sf)
-            total_usage = sum(r['usage'] for r in readings)
-            avg_monthly_usage = total_usage / len(readings)
+            avg_monthly_usage = float(recent.usage.mean())
             
             # Convert kWh to kBTU (1 kWh = 3.412 kBTU)
             usage_kbtu = avg_monthly_usage * 3.412
@@ -104,11 +222,8 @@ class InsightsEngine:
                     insight_type='energy',
                     entity_id=building['id'],
                     entity_type='building',
-                    title=f"High Energy Intensity at {building['name']}",
-                    description=f"This building uses {monthly_intensity:.1f} kBTU/sf/year, "
-                               f"significantly above the benchmark of 100 kBTU/sf/year. "
-                               f"Consider energy efficiency upgrades such as LED lighting, "
-                               f"HVAC optimization, or building envelope improvements.",
+                    title=self.EFFICIENCY_TITLE.format(name=building['name']),
+                    description=self.EFFICIENCY_DESCRIPTION.format(intensity=monthly_intensity),
                     priority='high',
                     category='Efficiency',
                     potential_savings=round(potential_savings, 2),
@@ -127,13 +242,13 @@ class InsightsEngine:
         
         return insights
     
-    def _generate_weather_insights(self, building: Dict) -> List[Dict]:
+    def _generate_weather_insights(self, building: Dict, as_of: datetime) -> List[Dict]:
         """Generate insights based on weather normalization"""
         insights = []
         
         try:
             # Calculate date range (last 12 months)
-            end_date = datetime.now()
+            end_date = as_of
             start_date = end_date - timedelta(days=365)
             
             # Get weather-normalized data
@@ -154,10 +269,10 @@ class InsightsEngine:
                     entity_id=building['id'],
                     entity_type='building',
                     title='High Weather Dependency Detected',
-                    description=f"Weather accounts for {weather_impact:.1f}% of energy variance "
-                               f"at {building['name']}. Consider insulation upgrades, "
-                               f"weather stripping, or window replacements to reduce "
-                               f"weather sensitivity and improve energy efficiency.",
+                    description=self.WEATHER_DESCRIPTION.format(
+                        impact=weather_impact,
+                        name=building['name']
+                    ),
                     priority='high' if weather_impact > 35 else 'medium',
                     category='Weather Impact',
                     potential_savings=round(normalized.get('original_usage', 0) * 0.15 * 0.15, 2),
@@ -193,11 +308,10 @@ class InsightsEngine:
                     entity_id=building['id'],
                     entity_type='building',
                     title='Traffic-Energy Correlation Found',
-                    description=f"Strong correlation (r={correlation:.2f}) detected between "
-                               f"nearby traffic patterns and energy usage at {building['name']}. "
-                               f"This suggests occupancy-driven consumption. Consider implementing "
-                               f"smart HVAC scheduling or occupancy sensors to optimize energy use "
-                               f"based on actual building occupancy patterns.",
+                    description=self.TRAFFIC_DESCRIPTION.format(
+                        correlation=correlation,
+                        name=building['name']
+                    ),
                     priority='medium',
                     category='Traffic Impact',
                     potential_savings=None,
@@ -212,95 +326,76 @@ class InsightsEngine:
         
         return insights
     
-    def _generate_anomaly_insights(self, building: Dict) -> List[Dict]:
-        """Generate insights based on anomaly detection"""
+    def _generate_anomaly_insights(self, building: Dict, readings: List[Dict]) -> List[Dict]:
+        """Generate insights based on anomaly detection over a building's readings in date order"""
         insights = []
         
         try:
-            # Get energy readings
-            energy_response = self.db.table('energy_readings')\
-                .select('*')\
-                .eq('building_id', building['id'])\
-                .order('reading_date')\
-                .execute()
-            
-            if not energy_response.data or len(energy_response.data) < 12:
+            if len(readings) < 12:
                 return insights
             
-            readings = energy_response.data
+            # Calculate monthly totals; np.unique sorts YYYY-MM keys chronologically
+            months = np.array([reading['reading_date'][:7] for reading in readings])
+            usage = np.fromiter((reading['usage'] for reading in readings), dtype=np.float64, count=len(readings))
+            date_keys, month_index = np.unique(months, return_inverse=True)
+            usage_values = np.bincount(month_index, weights=usage)
             
-            # Calculate monthly totals
-            from collections import defaultdict
-            monthly_usage = defaultdict(float)
-            
-            for reading in readings:
-                date_key = reading['reading_date'][:7]  # YYYY-MM
-                monthly_usage[date_key] += reading['usage']
-            
-            usage_values = list(monthly_usage.values())
-            
-            if len(usage_values) < 12:
+            if len(date_keys) < 12:
                 return insights
             
-            # Detect anomalies using z-score
-            mean_usage = np.mean(usage_values)
-            std_usage = np.std(usage_values)
+            # Detect anomalies using z-score in a single vectorized pass
+            anomalies, z_scores = detect_zscore_anomalies(
+                usage_values,
+                self.config.ANOMALY_ZSCORE_THRESHOLD
+            )
             
-            for date_key, usage in monthly_usage.items():
-                if std_usage > 0:
-                    z_score = (usage - mean_usage) / std_usage
-                    
-                    if abs(z_score) > self.config.ANOMALY_ZSCORE_THRESHOLD:
-                        anomaly_type = "spike" if z_score > 0 else "drop"
-                        
-                        insight = Insight(
-                            insight_type='energy',
-                            entity_id=building['id'],
-                            entity_type='building',
-                            title=f"Unusual Energy {anomaly_type.capitalize()} Detected",
-                            description=f"Energy usage in {date_key} was {usage:.0f} kWh, "
-                                       f"which is {abs(z_score):.1f} standard deviations from "
-                                       f"the average. Investigate potential equipment issues, "
-                                       f"operational changes, or data collection problems.",
-                            priority='medium',
-                            category='Maintenance',
-                            potential_savings=None,
-                            confidence_score=min(abs(z_score) * 20, 95),
-                            data_sources=['energy'],
-                            metadata={
-                                'z_score': round(z_score, 2),
-                                'usage': round(usage, 2),
-                                'mean': round(mean_usage, 2),
-                                'date': date_key
-                            }
-                        )
-                        insights.append(insight.to_dict())
-                        break  # Only report one anomaly to avoid spam
+            # Only report the first anomaly to avoid spam
+            if len(anomalies):
+                idx = int(anomalies[0])
+                date_key = str(date_keys[idx])
+                usage = float(usage_values[idx])
+                z_score = float(z_scores[idx])
+                mean_usage = float(usage_values.mean())
+                anomaly_type = "spike" if z_score > 0 else "drop"
+                
+                insight = Insight(
+                    insight_type='energy',
+                    entity_id=building['id'],
+                    entity_type='building',
+                    title=self.ANOMALY_TITLE.format(anomaly_type=anomaly_type.capitalize()),
+                    description=self.ANOMALY_DESCRIPTION.format(
+                        date=date_key,
+                        usage=usage,
+                        z_score=abs(z_score)
+                    ),
+                    priority='medium',
+                    category='Maintenance',
+                    potential_savings=None,
+                    confidence_score=min(abs(z_score) * 20, 95),
+                    data_sources=['energy'],
+                    metadata={
+                        'z_score': round(z_score, 2),
+                        'usage': round(usage, 2),
+                        'mean': round(mean_usage, 2),
+                        'date': date_key
+                    }
+                )
+                insights.append(insight.to_dict())
             
         except Exception as e:
             logger.error(f"Error generating anomaly insights: {str(e)}")
         
         return insights
     
-    def _generate_cost_insights(self, building: Dict) -> List[Dict]:
+    def _generate_cost_insights(self, building: Dict, recent: ReadingBatch) -> List[Dict]:
         """Generate cost savings opportunities"""
         insights = []
         
         try:
-            # Get recent cost data
-            energy_response = self.db.table('energy_readings')\
-                .select('*')\
-                .eq('building_id', building['id'])\
-                .order('reading_date', desc=True)\
-                .limit(12)\
-                .execute()
-            
-            if not energy_response.data:
+            if not len(recent):
                 return insights
             
-            readings = energy_response.data
-            total_cost = sum(r['cost'] for r in readings)
-            monthly_avg_cost = total_cost / len(readings)
+            monthly_avg_cost = float(recent.cost.mean())
             
             # If monthly cost is high, suggest optimization
             if monthly_avg_cost > 10000:
@@ -310,11 +405,12 @@ class InsightsEngine:
                     insight_type='energy',
                     entity_id=building['id'],
                     entity_type='building',
-                    title=f"Significant Cost Reduction Opportunity",
-                    description=f"Average monthly energy cost of ${monthly_avg_cost:,.2f} "
-                               f"at {building['name']} presents opportunity for savings. "
-                               f"Implementing energy management strategies could reduce costs "
-                               f"by approximately ${potential_savings:,.2f}/month.",
+                    title="Significant Cost Reduction Opportunity",
+                    description=self.COST_DESCRIPTION.format(
+                        monthly_cost=monthly_avg_cost,
+                        name=building['name'],
+                        monthly_savings=potential_savings
+                    ),
                     priority='high',
                     category='Cost Savings',
                     potential_savings=round(potential_savings * 12, 2),  # Annual savings
@@ -330,4 +426,9 @@ class InsightsEngine:
         except Exception as e:
             logger.error(f"Error generating cost insights: {str(e)}")
         
-        return insights
\ No newline at end of file
+        return insights
+
+@lru_cache(maxsize=1)
+def get_insights_engine() -> InsightsEngine:
+    """Return the process-wide InsightsEngine, constructing it on first use"""
+    return InsightsEngine()
@@ -4,7 +4,7 @@ from typing import List, Dict
 from config import Config
 from models.traffic import TrafficIntersection, TrafficData
 from utils.supabase_client import SupabaseClient
-from utils.helpers import generate_random_coords, generate_date_range
+from utils.helpers import generate_random_coords, generate_date_range, chunked
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ class TrafficDataGenerator:
             "Atlantic Ave", "Huntington Ave"
         ]
         
-        intersections = []
+        intersection_dicts = []
         
         for i in range(self.config.NUM_TRAFFIC_INTERSECTIONS):
             lat, lng = generate_random_coords(self.config.BOSTON_BOUNDS)
@@ -42,11 +42,16 @@ class TrafficDataGenerator:
                 streets=[street1, street2]
             )
             
-            response = self.db.table('traffic_intersections').insert(intersection.to_dict()).execute()
-            intersection_data = response.data[0]
-            intersections.append(intersection_data)
-            
-            logger.info(f"Created intersection: {intersection.name} (ID: {intersection_data['id']})")
+            intersection_dicts.append(intersection.to_dict())
+        
+        # Insert in bulk; rows come back in input order with their ids
+        intersections = []
+        for batch in chunked(intersection_dicts, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('traffic_intersections').insert(batch).execute()
+            intersections.extend(response.data)
+        
+        for intersection_data in intersections:
+            logger.info(f"Created intersection: {intersection_data['name']} (ID: {intersection_data['id']})")
         
         return intersections
     
@@ -54,28 +59,32 @@ class TrafficDataGenerator:
         """Generate traffic data for all intersections"""
         logger.info("Generating traffic data for all intersections...")
         
-        intersections_response = self.db.table('traffic_intersections').select('*').execute()
+        intersections_response = self.db.table('traffic_intersections').select('id, name').execute()
         intersections = intersections_response.data
         
-        all_traffic_data = []
+        # Every intersection shares the same hourly window, so compute it once
+        end_date = datetime.now()
+        start_date = end_date - timedelta(days=1)
+        timestamps = generate_date_range(start_date, end_date, freq='H')
         
+        rows = []
         for intersection in intersections:
-            traffic_data = self._generate_traffic_data_for_intersection(intersection)
-            all_traffic_data.extend(traffic_data)
+            rows.extend(self._generate_traffic_data_for_intersection(intersection, timestamps))
+        
+        # Insert in bulk rather than one request per reading
+        all_traffic_data = []
+        for batch in chunked(rows, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('traffic_data').insert(batch).execute()
+            all_traffic_data.extend(response.data)
         
         logger.info(f"Generated {len(all_traffic_data)} total traffic readings")
         return all_traffic_data
     
-    def _generate_traffic_data_for_intersection(self, intersection: dict) -> list[dict]:
-        """Generate traffic data for a single intersection with directional counts"""
+    def _generate_traffic_data_for_intersection(self, intersection: dict, timestamps: List[datetime]) -> list[dict]:
+        """Generate traffic rows with directional counts for a single intersection, ready for insertion"""
         traffic_data = []
         
-        # Generate hourly readings for the past 30 days
-        end_date = datetime.now()
-        start_date = end_date - timedelta(days=1)
-        dates = generate_date_range(start_date, end_date, freq='H')
-        
-        for timestamp in dates:
+        for timestamp in timestamps:
             hour = timestamp.hour
             
             # Determine time period and traffic characteristics
@@ -133,8 +142,7 @@ class TrafficDataGenerator:
                 congestion_level=congestion_level
             )
             
-            response = self.db.table('traffic_data').insert(traffic_reading.to_dict()).execute()
-            traffic_data.append(response.data[0])
+            traffic_data.append(traffic_reading.to_dict())
         
         logger.info(f"Generated {len(traffic_data)} readings for intersection {intersection['name']}")
         return traffic_data
@@ -4,7 +4,7 @@ from typing import List, Dict
 from config import Config
 from models.weather import WeatherStation, WeatherData
 from utils.supabase_client import SupabaseClient
-from utils.helpers import generate_random_coords, generate_date_range
+from utils.helpers import generate_random_coords, generate_date_range, chunked
 import logging
 
 logger = logging.getLogger(__name__)
@@ -26,7 +26,7 @@ class WeatherDataGenerator:
             "Charles River Station"
         ]
         
-        stations = []
+        station_dicts = []
         
         for i in range(self.config.NUM_WEATHER_STATIONS):
             lat, lng = generate_random_coords(self.config.BOSTON_BOUNDS)
@@ -36,12 +36,16 @@ class WeatherDataGenerator:
                 latitude=lat,
                 longitude=lng
             )
-            
-            response = self.db.table('weather_stations').insert(station.to_dict()).execute()
-            station_data = response.data[0]
-            stations.append(station_data)
-            
-            logger.info(f"Created weather station: {station.name} (ID: {station_data['id']})")
+            station_dicts.append(station.to_dict())
+        
+        # Insert in bulk; rows come back in input order with their ids
+        stations = []
+        for batch in chunked(station_dicts, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('weather_stations').insert(batch).execute()
+            stations.extend(response.data)
+        
+        for station_data in stations:
+            logger.info(f"Created weather station: {station_data['name']} (ID: {station_data['id']})")
         
         return stations
     
@@ -49,40 +53,42 @@ class WeatherDataGenerator:
         """Generate weather data for all stations"""
         logger.info("Generating weather data for all stations...")
         
-        stations_response = self.db.table('weather_stations').select('*').execute()
+        stations_response = self.db.table('weather_stations').select('id, name').execute()
         stations = stations_response.data
         
-        all_weather_data = []
+        # Every station covers the same daily window, so compute it once
+        dates = generate_date_range(
+            self.config.DATA_START_DATE,
+            self.config.DATA_END_DATE,
+            freq='D'
+        )
         
+        rows = []
         for station in stations:
-            weather_data = self._generate_weather_data_for_station(station)
-            all_weather_data.extend(weather_data)
+            rows.extend(self._generate_weather_data_for_station(station, dates))
+        
+        # Insert in bulk rather than one request per reading
+        all_weather_data = []
+        for batch in chunked(rows, self.config.DB_INSERT_BATCH_SIZE):
+            response = self.db.table('weather_data').insert(batch).execute()
+            all_weather_data.extend(response.data)
         
         logger.info(f"Generated {len(all_weather_data)} total weather readings")
         return all_weather_data
     
-    def _generate_weather_data_for_station(self, station: Dict) -> List[Dict]:
-        """Generate weather data for a single station"""
+    def _generate_weather_data_for_station(self, station: Dict, dates: List[datetime]) -> List[Dict]:
+        """Generate daily weather rows for a single station, ready for insertion"""
         weather_data = []
         
-        # Generate daily readings
-        dates = generate_date_range(
-            self.config.DATA_START_DATE,
-            self.config.DATA_END_DATE,
-            freq='D'
-        )
+        # Boston seasonal temperatures (°F)
+        base_temps = {
+            1: 30, 2: 32, 3: 40, 4: 50, 5: 60, 6: 70,
+            7: 75, 8: 74, 9: 67, 10: 57, 11: 47, 12: 35
+        }
         
         for date in dates:
             # Generate realistic temperature based on season
-            month = date.month
-            
-            # Boston seasonal temperatures (°F)
-            base_temps = {
-                1: 30, 2: 32, 3: 40, 4: 50, 5: 60, 6: 70,
-                7: 75, 8: 74, 9: 67, 10: 57, 11: 47, 12: 35
-            }
-            
-            base_temp = base_temps[month]
+            base_temp = base_temps[date.month]
             temp_avg = base_temp + random.uniform(-10, 10)
             temp_min = temp_avg - random.uniform(5, 15)
             temp_max = temp_avg + random.uniform(5, 15)
@@ -108,8 +114,7 @@ class WeatherDataGenerator:
                 humidity=round(humidity, 1)
             )
             
-            response = self.db.table('weather_data').insert(weather_reading.to_dict()).execute()
-            weather_data.append(response.data[0])
+            weather_data.append(weather_reading.to_dict())
         
         logger.info(f"Generated {len(weather_data)} readings for station {station['name']}")
         return weather_data
@@ -27,7 +27,7 @@ class WeatherNormalizer:
             
             # Get energy readings
             energy_response = self.db.table('energy_readings')\
-                .select('*')\
+                .select('reading_date, usage, cost')\
                 .eq('building_id', building_id)\
                 .gte('reading_date', start_date)\
                 .lte('reading_date', end_date)\
@@ -41,23 +41,24 @@ class WeatherNormalizer:
                     'original_usage': 0
                 }
             
+            energy_df = pd.DataFrame(energy_response.data)
+            
             # Get weather data for same period
             weather_response = self.db.table('weather_data')\
-                .select('*')\
+                .select('reading_date, heating_degree_days, cooling_degree_days')\
                 .gte('reading_date', start_date)\
                 .lte('reading_date', end_date)\
                 .execute()
             
             if not weather_response.data:
                 logger.warning("No weather data found for the period")
+                total_usage = float(energy_df['usage'].sum())
                 return {
                     'error': 'No weather data available',
-                    'normalized_usage': sum(r['usage'] for r in energy_response.data),
-                    'original_usage': sum(r['usage'] for r in energy_response.data)
+                    'normalized_usage': total_usage,
+                    'original_usage': total_usage
                 }
             
-            # Convert to DataFrames
-            energy_df = pd.DataFrame(energy_response.data)
             weather_df = pd.DataFrame(weather_response.data)
             
             # Aggregate energy by date (sum all fuel types)
@@ -76,10 +77,11 @@ class WeatherNormalizer:
             
             if len(merged) < 10:
                 logger.warning("Insufficient data points for normalization")
+                total_usage = energy_daily['usage'].sum()
                 return {
                     'error': 'Insufficient data for normalization',
-                    'normalized_usage': energy_daily['usage'].sum(),
-                    'original_usage': energy_daily['usage'].sum()
+                    'normalized_usage': total_usage,
+                    'original_usage': total_usage
                 }
             
             # Calculate total degree days
@@ -148,29 +150,15 @@ class WeatherNormalizer:
     def get_weather_summary(self, start_date: str, end_date: str) -> Dict:
         """Get weather summary for a date range"""
         try:
-            weather_response = self.db.table('weather_data')\
-                .select('*')\
-                .gte('reading_date', start_date)\
-                .lte('reading_date', end_date)\
-                .execute()
+            # Aggregated in the database; NULL when the range has no readings
+            summary = self.db.rpc('weather_summary', {
+                'p_start': start_date,
+                'p_end': end_date
+            }).execute().data
             
-            if not weather_response.data:
+            if not summary:
                 return {'error': 'No weather data available'}
             
-            df = pd.DataFrame(weather_response.data)
-            
-            summary = {
-                'avg_temperature': round(df['temp_avg'].mean(), 1),
-                'min_temperature': round(df['temp_min'].min(), 1),
-                'max_temperature': round(df['temp_max'].max(), 1),
-                'total_heating_degree_days': int(df['heating_degree_days'].sum()),
-                'total_cooling_degree_days': int(df['cooling_degree_days'].sum()),
-                'total_precipitation': round(df['precipitation'].sum(), 2),
-                'avg_humidity': round(df['humidity'].mean(), 1),
-                'avg_wind_speed': round(df['wind_speed'].mean(), 1),
-                'days': len(df)
-            }
-            
             return summary
             
         except Exception as e:
@@ -2,7 +2,7 @@
 Utility modules for the Boston Energy Insights backend
 """
 
-from .supabase_client import SupabaseClient
+from .supabase_client import SupabaseClient, get_supabase_client
 from .helpers import *
 
-__all__ = ['SupabaseClient']
\ No newline at end of file
+__all__ = ['SupabaseClient', 'get_supabase_client']
\ No newline at end of file
@@ -0,0 +1,83 @@
+from concurrent.futures import ThreadPoolExecutor
+from functools import wraps
+from flask import current_app, request
+from flask_caching import Cache
+import logging
+import threading
+import time
+
+logger = logging.getLogger(__name__)
+
+# Response cache for read-only GET endpoints; bound to the app in create_app
+cache = Cache()
+
+# Background re-renders of stale entries, and the keys currently being refreshed
+_refresh_pool = ThreadPoolExecutor(max_workers=4, thread_name_prefix='cache-refresh')
+_refreshing = set()
+_refreshing_lock = threading.Lock()
+
+def is_success(rv) -> bool:
+    """Cache only successful view results so errors are retried on the next request"""
+    status = rv[1] if isinstance(rv, tuple) else rv.status_code
+    return 200 <= status < 300
+
+def conditional_get(view):
+    """Give successful responses a weak ETag of their body and answer a matching
+    If-None-Match with an empty 304, so polling clients skip unchanged payloads"""
+    @wraps(view)
+    def wrapper(*args, **kwargs):
+        response = current_app.make_response(view(*args, **kwargs))
+        # Streamed bodies would have to be buffered to hash them
+        if response.status_code == 200 and not response.is_streamed:
+            # Weak, since the gzip middleware may re-encode the body
+            response.add_etag(weak=True)
+            response.make_conditional(request)
+        return response
+    return wrapper
+
+def stale_while_revalidate(fresh: int, stale: int):
+    """Serve a cached GET response for fresh seconds, then for up to stale more
+    seconds while a single background request renders a replacement"""
+    def decorator(view):
+        @wraps(view)
+        def wrapper(*args, **kwargs):
+            key = f"swr:{request.full_path}"
+            entry = cache.get(key)
+            if entry is None:
+                return _render_and_store(key, view, args, kwargs, fresh, stale)
+            
+            body, status, headers, fresh_until = entry
+            if time.time() >= fresh_until:
+                _schedule_refresh(key, view, args, kwargs, fresh, stale)
+            return current_app.response_class(body, status=status, headers=headers)
+        return wrapper
+    return decorator
+
+def _render_and_store(key, view, args, kwargs, fresh, stale):
+    """Run the view and cache its response if it succeeded"""
+    response = current_app.make_response(view(*args, **kwargs))
+    if 200 <= response.status_code < 300:
+        entry = (response.get_data(), response.status_code, list(response.headers.items()), time.time() + fresh)
+        cache.set(key, entry, timeout=fresh + stale)
+    return response
+
+def _schedule_refresh(key, view, args, kwargs, fresh, stale):
+    """Re-render key in the background unless a refresh is already running"""
+    with _refreshing_lock:
+        if key in _refreshing:
+            return
+        _refreshing.add(key)
+    _refresh_pool.submit(
+        _refresh, current_app._get_current_object(), request.full_path,
+        key, view, args, kwargs, fresh, stale
+    )
+
+def _refresh(app, path, key, view, args, kwargs, fresh, stale):
+    try:
+        with app.test_request_context(path):
+            _render_and_store(key, view, args, kwargs, fresh, stale)
+    except Exception as e:
+        logger.error(f"Background refresh of {path} failed: {str(e)}")
+    finally:
+        with _refreshing_lock:
+            _refreshing.discard(key)
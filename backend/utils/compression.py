@@ -0,0 +1,61 @@
+import zlib
+
+COMPRESSIBLE_TYPES = ('application/json', 'text/')
+UNCOMPRESSED_STATUSES = (204, 304)
+
+class GzipMiddleware:
+    """WSGI middleware that gzips JSON and text responses for clients that accept it"""
+
+    def __init__(self, app, min_size=500, level=6):
+        self.app = app
+        self.min_size = min_size
+        self.level = level
+
+    def _compressible(self, status, headers):
+        """Whether a response with this status and these headers is worth compressing"""
+        if int(status[:3]) in UNCOMPRESSED_STATUSES:
+            return False
+        content_type = ''
+        length = None
+        for name, value in headers:
+            name = name.lower()
+            if name == 'content-encoding':
+                return False
+            if name == 'content-type':
+                content_type = value
+            elif name == 'content-length':
+                length = int(value)
+        # Streamed bodies have no length up front and are always large enough
+        return content_type.startswith(COMPRESSIBLE_TYPES) and (length is None or length >= self.min_size)
+
+    def _compress(self, app_iter):
+        # wbits=31 writes a gzip container rather than a raw zlib stream
+        compressor = zlib.compressobj(self.level, zlib.DEFLATED, 31)
+        try:
+            for chunk in app_iter:
+                # Sync-flush each chunk so streamed responses still reach the client incrementally
+                yield compressor.compress(chunk) + compressor.flush(zlib.Z_SYNC_FLUSH)
+            yield compressor.flush()
+        finally:
+            if hasattr(app_iter, 'close'):
+                app_iter.close()
+
+    def __call__(self, environ, start_response):
+        accepts_gzip = (
+            'gzip' in environ.get('HTTP_ACCEPT_ENCODING', '')
+            and environ.get('REQUEST_METHOD') != 'HEAD'
+        )
+        compress = False
+
+        def gzip_start_response(status, headers, exc_info=None):
+            nonlocal compress
+            if self._compressible(status, headers):
+                headers.append(('Vary', 'Accept-Encoding'))
+                if accepts_gzip:
+                    compress = True
+                    headers[:] = [(name, value) for name, value in headers if name.lower() != 'content-length']
+                    headers.append(('Content-Encoding', 'gzip'))
+            return start_response(status, headers, exc_info)
+
+        app_iter = self.app(environ, gzip_start_response)
+        return self._compress(app_iter) if compress else app_iter
@@ -0,0 +1,51 @@
+ALLOWED_METHODS = ['GET', 'POST', 'PUT', 'DELETE', 'OPTIONS']
+ALLOWED_HEADERS = ['Content-Type', 'Authorization']
+PREFLIGHT_MAX_AGE = 86400
+
+class CORSMiddleware:
+    """WSGI middleware that answers preflights and tags responses with CORS headers"""
+
+    def __init__(self, app, origins=('*',), methods=None, headers=None, max_age=PREFLIGHT_MAX_AGE):
+        self.app = app
+        self.allow_any_origin = '*' in origins
+        self.origins = frozenset(origins)
+
+        # Header values are fixed for the lifetime of the app, so join them once
+        self.response_headers = [
+            ('Access-Control-Allow-Methods', ','.join(methods or ALLOWED_METHODS)),
+            ('Access-Control-Allow-Headers', ','.join(headers or ALLOWED_HEADERS))
+        ]
+        if self.allow_any_origin:
+            self.response_headers.insert(0, ('Access-Control-Allow-Origin', '*'))
+        else:
+            self.response_headers.append(('Vary', 'Origin'))
+        self.preflight_headers = self.response_headers + [
+            ('Access-Control-Max-Age', str(max_age)),
+            ('Content-Length', '0')
+        ]
+
+    def _cors_headers(self, environ, base_headers):
+        """Headers to add for this request, or None if the origin is not allowed"""
+        if self.allow_any_origin:
+            return base_headers
+        origin = environ.get('HTTP_ORIGIN')
+        if origin not in self.origins:
+            return None
+        return [('Access-Control-Allow-Origin', origin)] + base_headers
+
+    def __call__(self, environ, start_response):
+        # Short-circuit preflights before Flask routing and view dispatch
+        if environ.get('REQUEST_METHOD') == 'OPTIONS':
+            headers = self._cors_headers(environ, self.preflight_headers)
+            start_response('200 OK', list(headers or [('Content-Length', '0')]))
+            return [b'']
+
+        cors_headers = self._cors_headers(environ, self.response_headers)
+        if cors_headers is None:
+            return self.app(environ, start_response)
+
+        def cors_start_response(status, headers, exc_info=None):
+            headers.extend(cors_headers)
+            return start_response(status, headers, exc_info)
+
+        return self.app(environ, cors_start_response)
@@ -1,7 +1,7 @@
 import random
 import string
 from datetime import datetime, timedelta
-from typing import List, Tuple
+from typing import Iterator, List, Mapping, Optional, Sequence, Tuple
 import numpy as np
 
 def generate_random_string(length: int = 10) -> str:
@@ -50,12 +50,47 @@ def generate_date_range(start_date: datetime, end_date: datetime, freq: str = 'D
     
     return dates
 
+def chunked(items: Sequence, size: int) -> Iterator[Sequence]:
+    """Yield consecutive slices of at most size items"""
+    for start in range(0, len(items), size):
+        yield items[start:start + size]
+
+def parse_int_arg(args: Mapping, name: str, default: int, minimum: int = 0, maximum: Optional[int] = None) -> int:
+    """Read an integer query parameter capped at maximum; raises ValueError if it is not an integer >= minimum"""
+    raw = args.get(name)
+    if raw is None:
+        return default
+    try:
+        value = int(raw)
+    except ValueError:
+        raise ValueError(f"'{name}' must be an integer")
+    if value < minimum:
+        raise ValueError(f"'{name}' must be at least {minimum}")
+    return value if maximum is None else min(value, maximum)
+
+def next_page_offset(offset: int, returned: int, limit: int, total: Optional[int] = None) -> Optional[int]:
+    """Offset of the page after one that returned `returned` rows, or None when it was the last"""
+    end = offset + returned
+    if total is not None:
+        return end if end < total else None
+    # Without a total, only a short page marks the end; limit must not exceed the server's max-rows
+    return end if returned and returned >= limit else None
+
 def calculate_z_score(value: float, mean: float, std: float) -> float:
     """Calculate z-score for anomaly detection"""
     if std == 0:
         return 0
     return (value - mean) / std
 
+def detect_zscore_anomalies(values: Sequence[float], threshold: float) -> Tuple[np.ndarray, np.ndarray]:
+    """Return (indices of values whose |z-score| exceeds threshold, all z-scores)"""
+    arr = np.asarray(values, dtype=np.float64)
+    std = arr.std()
+    if std == 0:
+        return np.empty(0, dtype=np.intp), np.zeros_like(arr)
+    z_scores = (arr - arr.mean()) / std
+    return np.flatnonzero(np.abs(z_scores) > threshold), z_scores
+
 def normalize_value(value: float, min_val: float, max_val: float) -> float:
     """Normalize value to 0-1 range"""
     if max_val == min_val:
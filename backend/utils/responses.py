@@ -0,0 +1,66 @@
+import orjson
+from flask import current_app
+from flask.json.provider import DefaultJSONProvider, JSONProvider
+from utils.helpers import chunked
+from config import Config
+
+# NumPy values and naive datetimes serialize natively; dict keys need not be strings
+ORJSON_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS
+
+# Rows encoded per streamed chunk; one chunk per row would flood the server with tiny writes
+STREAM_CHUNK_ROWS = 500
+
+STATIC_CACHE_CONTROL = f'public, max-age={Config.STATIC_RESPONSE_MAX_AGE}, immutable'
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider backed by orjson, used by jsonify and request.get_json"""
+    
+    # Types orjson does not know (Decimal, UUID subclasses, ...) fall back to Flask's handling
+    default = staticmethod(DefaultJSONProvider.default)
+    
+    def dumps(self, obj, **kwargs) -> str:
+        return orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS).decode()
+    
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+    
+    def response(self, *args, **kwargs):
+        """Like jsonify, but hands orjson's bytes straight to the response"""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(
+            orjson.dumps(obj, default=self.default, option=ORJSON_OPTIONS),
+            mimetype='application/json'
+        )
+
+def ojsonify(data, status: int = 200):
+    """Build a JSON response with orjson, for payloads too large for jsonify to encode cheaply"""
+    return current_app.response_class(
+        orjson.dumps(data, default=OrjsonProvider.default, option=ORJSON_OPTIONS),
+        status=status,
+        mimetype='application/json'
+    )
+
+def static_json(data) -> bytes:
+    """Encode a constant payload once, at import time, for static_response"""
+    return orjson.dumps(data, option=ORJSON_OPTIONS)
+
+def static_response(body: bytes):
+    """Serve a pre-encoded JSON body that browsers and CDNs may cache as immutable"""
+    return current_app.response_class(
+        body,
+        mimetype='application/json',
+        headers={'Cache-Control': STATIC_CACHE_CONTROL}
+    )
+
+def stream_rows(key: str, rows: list, status: int = 200, **fields):
+    """Stream {"success": true, **fields, key: rows} without encoding the whole body at once"""
+    head = orjson.dumps({'success': True, **fields}, option=ORJSON_OPTIONS)[:-1]
+    
+    def generate():
+        yield head + b',' + orjson.dumps(key) + b':['
+        for i, batch in enumerate(chunked(rows, STREAM_CHUNK_ROWS)):
+            body = b','.join(orjson.dumps(row, option=ORJSON_OPTIONS) for row in batch)
+            yield body if i == 0 else b',' + body
+        yield b']}'
+    
+    return current_app.response_class(generate(), status=status, mimetype='application/json')
@@ -1,4 +1,6 @@
-from supabase import create_client, Client
+from functools import lru_cache
+import httpx
+from supabase import create_client, Client, ClientOptions
 from config import Config
 import logging
 
@@ -11,18 +13,41 @@ class SupabaseClient:
     
     def __new__(cls):
         if cls._instance is None:
-            cls._instance = super(SupabaseClient, cls).__new__(cls)
             try:
                 cls._client = create_client(
                     Config.SUPABASE_URL,
-                    Config.SUPABASE_KEY
+                    Config.SUPABASE_KEY,
+                    options=ClientOptions(
+                        schema='public',
+                        postgrest_client_timeout=Config.REQUEST_TIMEOUT,
+                        httpx_client=cls._build_http_client()
+                    )
                 )
                 logger.info("Supabase client initialized successfully")
             except Exception as e:
                 logger.error(f"Failed to initialize Supabase client: {str(e)}")
                 raise
+            cls._instance = super(SupabaseClient, cls).__new__(cls)
         return cls._instance
     
+    @staticmethod
+    def _build_http_client() -> httpx.Client:
+        """HTTP client with explicit pool limits shared by all PostgREST requests"""
+        return httpx.Client(
+            timeout=httpx.Timeout(
+                Config.REQUEST_TIMEOUT,
+                connect=Config.SUPABASE_CONNECT_TIMEOUT,
+                pool=Config.SUPABASE_POOL_TIMEOUT
+            ),
+            limits=httpx.Limits(
+                max_connections=Config.SUPABASE_MAX_CONNECTIONS,
+                max_keepalive_connections=Config.SUPABASE_MAX_KEEPALIVE_CONNECTIONS,
+                keepalive_expiry=Config.SUPABASE_KEEPALIVE_EXPIRY
+            ),
+            http2=True,
+            follow_redirects=True
+        )
+    
     def get_client(self) -> Client:
         """Get the Supabase client instance"""
         if self._client is None:
@@ -36,4 +61,9 @@ class SupabaseClient:
             return True
         except Exception as e:
             logger.error(f"Database connection test failed: {str(e)}")
-            return False
\ No newline at end of file
+            return False
+
+@lru_cache(maxsize=1)
+def get_supabase_client() -> SupabaseClient:
+    """Return the process-wide SupabaseClient, constructing it on first use"""
+    return SupabaseClient()
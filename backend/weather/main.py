@@ -1,13 +1,26 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
 import httpx
 from datetime import datetime
 import pytz
 
+# One client for every OpenMeteo request, so concurrent handlers share its
+# keep-alive connections on the event loop instead of each opening their own
+http_client = httpx.AsyncClient(timeout=5.0)
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    yield
+    await http_client.aclose()
+
+
 app = FastAPI(
     title="Weather (OpenMeteo) Service",
     description="Weather API service for Boston traffic and energy management",
-    version="1.0.1"
+    version="1.0.1",
+    lifespan=lifespan
 )
 
 # Configure CORS
@@ -42,11 +55,10 @@ async def get_current_weather_openmeteo():
         f"&hourly=precipitation_probability"
         f"&forecast_days=1"
     )
-    async with httpx.AsyncClient() as client:
-        r = await client.get(url)
-        if r.status_code != 200:
-            raise HTTPException(status_code=500, detail="Weather API error")
-        data = r.json()
+    r = await http_client.get(url)
+    if r.status_code != 200:
+        raise HTTPException(status_code=500, detail="Weather API error")
+    data = r.json()
 
     current = data.get("current", {})
     
@@ -87,11 +99,10 @@ async def get_forecast_openmeteo():
         f"&forecast_days=1"
     )
 
-    async with httpx.AsyncClient() as client:
-        r = await client.get(url)
-        if r.status_code != 200:
-            raise HTTPException(status_code=500, detail="Weather API error")
-        data = r.json()
+    r = await http_client.get(url)
+    if r.status_code != 200:
+        raise HTTPException(status_code=500, detail="Weather API error")
+    data = r.json()
 
     h = data.get("hourly", {})
     times = h.get("time", [])
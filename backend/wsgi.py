@@ -1,6 +1,7 @@
 """
 WSGI entry point for production deployment
 Usage: gunicorn -w 4 -b 0.0.0.0:5000 wsgi:app
+(no --preload: the log listener thread and HTTP pools must be created in each worker)
 """
 
 from app import create_app